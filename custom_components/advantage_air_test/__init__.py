@@ -1,63 +1,131 @@
 """Advantage Air climate integration."""
-from datetime import timedelta
+from functools import partial
 import logging
+import time
 
 from .advantage_air import ApiError, advantage_air
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_IP_ADDRESS, CONF_PORT, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import ADVANTAGE_AIR_RETRY, DOMAIN
+from .const import (
+    ADVANTAGE_AIR_COALESCE,
+    ADVANTAGE_AIR_CONFIRM_TIMEOUT,
+    ADVANTAGE_AIR_DEADLINE,
+    ADVANTAGE_AIR_DRAIN_TIMEOUT,
+    ADVANTAGE_AIR_HEDGE_BUDGET,
+    ADVANTAGE_AIR_MAX_QUERY,
+    ADVANTAGE_AIR_OFFLOAD_ALWAYS,
+    ADVANTAGE_AIR_OFFLOAD_AUTO,
+    ADVANTAGE_AIR_OFFLOAD_THRESHOLD,
+    ADVANTAGE_AIR_OVERLAY_TTL,
+    ADVANTAGE_AIR_PROJECTION,
+    ADVANTAGE_AIR_RETRY,
+    ADVANTAGE_AIR_SYNC_INTERVAL,
+    ADVANTAGE_AIR_TIMEOUT,
+    ADVANTAGE_AIR_TIMEOUT_FLOOR,
+    CONF_COALESCE,
+    CONF_CONFIRM,
+    CONF_CONFIRM_TIMEOUT,
+    CONF_DEADLINE,
+    CONF_FULL_DOCUMENT,
+    CONF_HEDGE,
+    CONF_MAX_QUERY,
+    CONF_OFFLOAD,
+    CONF_PROXY,
+    CONF_RETRY,
+    CONF_SYNC_INTERVAL,
+    CONF_TIMEOUT,
+    CONF_TIMEOUT_FLOOR,
+    DOMAIN,
+)
+from .entity import changed_subtrees, topology, touches_topology
+from .runtime import AdvantageAirRuntime
+from .scheduler import async_get_scheduler
+from .services import SERVICE_RECORD, async_setup_services
 
-ADVANTAGE_AIR_SYNC_INTERVAL = 15
-PLATFORMS = [
+# Platforms are only loaded once the system data has entities for them
+PLATFORMS_AIRCONS = {
     Platform.BINARY_SENSOR,
     Platform.CLIMATE,
-    Platform.COVER,
     Platform.NUMBER,
     Platform.SELECT,
     Platform.SENSOR,
-    Platform.SWITCH,
-    Platform.UPDATE,
-    Platform.LIGHT,
-]
+}
+# Platform of each thing type, by channelDipState
+PLATFORMS_THINGS = {
+    1: Platform.COVER,
+    2: Platform.COVER,
+    3: Platform.COVER,
+    4: Platform.LIGHT,
+    5: Platform.LIGHT,
+    8: Platform.SWITCH,
+}
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Advantage Air config."""
+    started = time.perf_counter()
     ip_address = entry.data[CONF_IP_ADDRESS]
     port = entry.data[CONF_PORT]
+    scheduler = async_get_scheduler(hass)
     api = advantage_air(
         ip_address,
         port=port,
         session=async_get_clientsession(hass),
-        retry=ADVANTAGE_AIR_RETRY,
+        executor=scheduler.executor,
+        hedge_budget=ADVANTAGE_AIR_HEDGE_BUDGET,
+        overlay_ttl=ADVANTAGE_AIR_OVERLAY_TTL,
     )
+    # Every request of a poll, but not its retry backoff, takes a shared slot
+    api.limiter = partial(scheduler.async_limit, entry.entry_id)
+    async_apply_options(entry, api)
+
+    runtime = AdvantageAirRuntime(
+        hass, entry.entry_id, partial(scheduler.interval, entry.entry_id)
+    )
+    await runtime.async_load()
+    instance = {}
 
     async def async_get():
         try:
-            return await api.async_get()
+            data = await api.async_get()
         except ApiError as err:
             raise UpdateFailed(err) from err
+        # Keep the previous object while nothing changed so platforms can skip reconciling
+        if api.changes is None or any(map(touches_topology, api.changes)):
+            if (current := topology(data)) != instance.get("topology"):
+                instance["topology"] = current
+        # Entities only write their state when their aircon, light or thing changed
+        instance["changed"] = changed_subtrees(api.changes)
+        runtime.async_update(data)
+        instance["fetched"] = hass.loop.time()
+        return data
 
     coordinator = DataUpdateCoordinator(
         hass,
         _LOGGER,
         name="Advantage Air",
         update_method=async_get,
-        update_interval=timedelta(seconds=ADVANTAGE_AIR_SYNC_INTERVAL),
     )
 
     def error_handle_factory(func):
         async def error_handle(param):
             try:
-                if await func(param):
+                # Confirmed writes wait until a poll shows the change
+                if await func(
+                    param,
+                    confirm=entry.options.get(CONF_CONFIRM, False),
+                    timeout=entry.options.get(
+                        CONF_CONFIRM_TIMEOUT, ADVANTAGE_AIR_CONFIRM_TIMEOUT
+                    ),
+                ):
                     await coordinator.async_refresh()
             except ApiError as err:
                 raise HomeAssistantError(err) from err
@@ -65,25 +133,137 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         return error_handle
 
     await coordinator.async_config_entry_first_refresh()
+    refreshed = time.perf_counter()
+    api.start()
 
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = {
-        "coordinator": coordinator,
-        "aircon": error_handle_factory(api.aircon.async_set),
-        "lights": error_handle_factory(api.lights.async_set),
-        "things": error_handle_factory(api.things.async_set),
-    }
+    hass.data[DOMAIN][entry.entry_id] = instance
+    instance.update(
+        {
+            "api": api,
+            "coordinator": coordinator,
+            "runtime": runtime,
+            "rid": coordinator.data["system"]["rid"],
+            "require": partial(scheduler.async_require, entry.entry_id),
+            "platforms": _platforms(coordinator.data),
+            "timings": {"first_refresh": refreshed - started, "platforms": {}},
+            "aircon": error_handle_factory(api.aircon.async_set),
+            "lights": error_handle_factory(api.lights.async_set),
+            "things": error_handle_factory(api.things.async_set),
+        }
+    )
+
+    # Polling is left to the shared scheduler rather than the coordinator itself
+    entry.async_on_unload(
+        scheduler.async_register(entry.entry_id, coordinator, _sync_interval(entry))
+    )
+
+    # Start of the forward of each platform, which covers importing its module
+    instance["timings"]["forwarded"] = dict.fromkeys(
+        instance["platforms"], time.perf_counter()
+    )
+    await hass.config_entries.async_forward_entry_setups(entry, instance["platforms"])
+    instance["timings"]["total"] = time.perf_counter() - started
+    _LOGGER.debug("Set up %s in %s", entry.title, instance["timings"])
+
+    @callback
+    def _async_forward_new_platforms() -> None:
+        """Load the platforms of parts of the system that appeared later."""
+        if new := _platforms(coordinator.data) - instance["platforms"]:
+            instance["platforms"] |= new
+            instance["timings"]["forwarded"].update(
+                dict.fromkeys(new, time.perf_counter())
+            )
+            hass.async_create_task(
+                hass.config_entries.async_forward_entry_setups(entry, new)
+            )
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(coordinator.async_add_listener(_async_forward_new_platforms))
+    if not hass.services.has_service(DOMAIN, SERVICE_RECORD):
+        async_setup_services(hass)
+    async_setup_options(hass, entry)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     return True
 
 
+def _platforms(data: dict) -> set[Platform]:
+    """Return the platforms that have entities for the system data."""
+    platforms = {Platform.UPDATE}
+    if aircons := data.get("aircons"):
+        platforms |= PLATFORMS_AIRCONS
+        # Zone vents and fresh air are the only aircon parts that are optional
+        if any(
+            zone["type"] == 0
+            for aircon in aircons.values()
+            for zone in aircon["zones"].values()
+        ):
+            platforms.add(Platform.COVER)
+        if any(aircon["info"]["freshAirStatus"] != "none" for aircon in aircons.values()):
+            platforms.add(Platform.SWITCH)
+    if data.get("myLights", {}).get("lights"):
+        platforms.add(Platform.LIGHT)
+    for thing in data.get("myThings", {}).get("things", {}).values():
+        if platform := PLATFORMS_THINGS.get(thing["channelDipState"]):
+            platforms.add(platform)
+    return platforms
+
+
+def _sync_interval(entry: ConfigEntry) -> float:
+    """Return the configured poll interval in seconds."""
+    return entry.options.get(CONF_SYNC_INTERVAL, ADVANTAGE_AIR_SYNC_INTERVAL)
+
+
+@callback
+def async_apply_options(entry: ConfigEntry, api: advantage_air) -> None:
+    """Apply the tuning options to a running client."""
+    options = entry.options
+    api.retry = options.get(CONF_RETRY, ADVANTAGE_AIR_RETRY)
+    api.timeout = options.get(CONF_TIMEOUT, ADVANTAGE_AIR_TIMEOUT)
+    api.timeout_floor = options.get(CONF_TIMEOUT_FLOOR, ADVANTAGE_AIR_TIMEOUT_FLOOR)
+    api.deadline = options.get(CONF_DEADLINE, ADVANTAGE_AIR_DEADLINE)
+    api.coalesce = options.get(CONF_COALESCE, ADVANTAGE_AIR_COALESCE)
+    api.max_query = options.get(CONF_MAX_QUERY, ADVANTAGE_AIR_MAX_QUERY)
+    api.hedge = options.get(CONF_HEDGE, False)
+    api.projection = (
+        None if options.get(CONF_FULL_DOCUMENT, False) else ADVANTAGE_AIR_PROJECTION
+    )
+    api.offload_threshold = {
+        ADVANTAGE_AIR_OFFLOAD_AUTO: ADVANTAGE_AIR_OFFLOAD_THRESHOLD,
+        ADVANTAGE_AIR_OFFLOAD_ALWAYS: 0,
+    }.get(options.get(CONF_OFFLOAD, ADVANTAGE_AIR_OFFLOAD_AUTO))
+
+
+@callback
+def async_setup_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Load the optional features that are enabled."""
+    if entry.options.get(CONF_PROXY, False):
+        from .proxy import async_setup_proxy
+
+        async_setup_proxy(hass)
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options without reloading the config entry."""
+    async_apply_options(entry, hass.data[DOMAIN][entry.entry_id]["api"])
+    async_get_scheduler(hass).async_set_interval(entry.entry_id, _sync_interval(entry))
+    async_setup_options(hass, entry)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload Advantage Air Config."""
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(
+        entry, hass.data[DOMAIN][entry.entry_id]["platforms"]
+    )
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        instance = hass.data[DOMAIN].pop(entry.entry_id)
+        await instance["api"].async_stop(ADVANTAGE_AIR_DRAIN_TIMEOUT)
+        await instance["runtime"].async_save()
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored runtime totals of a deleted config entry."""
+    await AdvantageAirRuntime(hass, entry.entry_id).async_remove()
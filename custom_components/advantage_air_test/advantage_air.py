@@ -1,7 +1,20 @@
 import json
+import gzip
+import time
 import asyncio
 import aiohttp
+import logging
+import contextlib
+import collections
 import collections.abc
+import urllib.parse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_LOGGER = logging.getLogger(__name__)
 
 
 def update(d, u):
@@ -13,14 +26,243 @@ def update(d, u):
     return d
 
 
+def flatten(d, prefix=()):
+    """Yield the path and value of every leaf in nested dicts"""
+    for k, v in d.items():
+        if isinstance(v, collections.abc.Mapping):
+            yield from flatten(v, prefix + (k,))
+        else:
+            yield prefix + (k,), v
+
+
+def nest(flat):
+    """Build nested dicts from leaves keyed by path"""
+    nested = {}
+    for path, value in flat.items():
+        d = nested
+        for k in path[:-1]:
+            d = d.setdefault(k, {})
+        d[path[-1]] = value
+    return nested
+
+
+def project(d, fields):
+    """Keep only the fields of a projection, True keeps a whole subtree and "*" matches every key"""
+    if fields is True or not isinstance(d, collections.abc.Mapping):
+        return d
+    if "*" in fields:
+        return {k: project(v, fields["*"]) for k, v in d.items()}
+    return {k: project(d[k], v) for k, v in fields.items() if k in d}
+
+
+def diff(old, new, prefix=()):
+    """Paths where two documents differ, an added or removed subtree is one path"""
+    changes = []
+    for k, v in new.items():
+        if k not in old:
+            changes.append(prefix + (k,))
+        elif isinstance(v, collections.abc.Mapping) and isinstance(
+            old[k], collections.abc.Mapping
+        ):
+            changes += diff(old[k], v, prefix + (k,))
+        elif v != old[k]:
+            changes.append(prefix + (k,))
+    for k in old.keys() - new.keys():
+        changes.append(prefix + (k,))
+    return changes
+
+
+def lookup(d, path):
+    """Value at a path in nested dicts, or None when it does not exist"""
+    for k in path:
+        if not isinstance(d, collections.abc.Mapping) or k not in d:
+            return None
+        d = d[k]
+    return d
+
+
+def query_length(change, dumps):
+    """Length of a change once encoded and quoted into the query string"""
+    return len(urllib.parse.quote(dumps(change), safe=""))
+
+
+def parts(change):
+    """Split a change at the first level with more than one key, keeping ids with every part"""
+    keys = [k for k in change if k != "id"]
+    ident = {"id": change["id"]} if "id" in change else {}
+    if len(keys) > 1:
+        return [{**ident, k: change[k]} for k in keys]
+    if len(keys) == 1 and isinstance(change[keys[0]], collections.abc.Mapping):
+        inner = parts(change[keys[0]])
+        if len(inner) > 1:
+            return [{**ident, keys[0]: part} for part in inner]
+    return [change]
+
+
+def split(change, limit, dumps):
+    """Split a change into the fewest chunks in order that fit in limit
+
+    Each aircon, light or thing stays in one chunk unless it does not fit on its own.
+    """
+    if not limit or query_length(change, dumps) <= limit:
+        return [change]
+
+    def fit(group):
+        if query_length(group, dumps) <= limit:
+            return [group]
+        smaller = parts(group)
+        if len(smaller) == 1:
+            # A single value that is too long is sent anyway for the controller to judge
+            return smaller
+        return [g for part in smaller for g in fit(part)]
+
+    chunks = []
+    chunk = {}
+    for group in fit(change):
+        candidate = update(update({}, chunk), group)
+        if chunk and query_length(candidate, dumps) > limit:
+            chunks.append(chunk)
+            chunk = update({}, group)
+        else:
+            chunk = candidate
+    chunks.append(chunk)
+    return chunks
+
+
+def leaves(change):
+    """Paths of every changed value, without the ids that only address them"""
+    return {path for path, _ in flatten(change) if path[-1] != "id"}
+
+
 class ApiError(Exception):
     """AdvantageAir Error"""
 
 
+class ApiRejected(ApiError):
+    """The controller replied ack false to a change"""
+
+
+class json_codec:
+    """Standard library JSON, decoding straight from bytes"""
+
+    name = "json"
+    loads = staticmethod(json.loads)
+    dumps = staticmethod(json.dumps)
+
+
+class orjson_codec:
+    """orjson, several times faster on large documents"""
+
+    name = "orjson"
+
+    @staticmethod
+    def loads(body):
+        return orjson.loads(body)
+
+    @staticmethod
+    def dumps(obj):
+        return orjson.dumps(obj).decode()
+
+
+CODECS = {codec.name: codec for codec in (json_codec, orjson_codec)}
+if orjson is None:
+    del CODECS["orjson"]
+# The fastest codec that is installed
+codec = orjson_codec if orjson else json_codec
+
+
+async def async_discover(hosts, port=2025, session=None, concurrency=64, timeout=0.5):
+    """Scan hosts for controllers, returning their system info by host"""
+
+    if session is None:
+        session = aiohttp.ClientSession()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe(host):
+        async with semaphore:
+            # A bare connect is much cheaper than HTTP for the many hosts that are not a controller
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(host, port), timeout
+                )
+            except (OSError, asyncio.TimeoutError):
+                return None
+            writer.close()
+            try:
+                return await advantage_air(
+                    host, port=port, session=session, timeout=timeout * 4
+                ).async_get(1)
+            except ApiError:
+                return None
+
+    hosts = [str(host) for host in hosts]
+    results = await asyncio.gather(*(probe(host) for host in hosts))
+    return {
+        host: data["system"]
+        for host, data in zip(hosts, results)
+        if data is not None and "system" in data
+    }
+
+
+class latency_estimate:
+    """Running latency of an endpoint, deriving timeouts like TCP's retransmission timer"""
+
+    def __init__(self):
+        self.samples = collections.deque(maxlen=100)
+        self.srtt = None
+        self.rttvar = None
+        self.backoff = 1
+        self.timeout = None
+
+    def sample(self, rtt):
+        self.samples.append(rtt)
+        self.backoff = 1
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    def expired(self):
+        """Back off after a timeout until the next response arrives"""
+        self.backoff *= 2
+
+    def choose(self, floor, ceiling, initial):
+        if self.srtt is None:
+            # Nothing measured yet, back off from the initial timeout towards the ceiling
+            self.timeout = min(max(initial * self.backoff, floor), ceiling)
+        else:
+            self.timeout = min(
+                max((self.srtt + 4 * self.rttvar) * self.backoff, floor), ceiling
+            )
+        return self.timeout
+
+
 class advantage_air:
     """AdvantageAir Connection"""
 
-    def __init__(self, ip, port=2025, session=None, retry=5):
+    def __init__(
+        self,
+        ip,
+        port=2025,
+        session=None,
+        retry=5,
+        timeout=20,
+        timeout_floor=1,
+        timeout_initial=4,
+        deadline=None,
+        coalesce=0,
+        executor=None,
+        hedge=False,
+        hedge_budget=0.05,
+        codec=codec,
+        max_query=2000,
+        max_bisect=8,
+        overlay_ttl=10,
+        projection=None,
+        offload_threshold=65536,
+    ):
 
         if session is None:
             session = aiohttp.ClientSession()
@@ -28,28 +270,106 @@ class advantage_air:
         self.ip = ip
         self.port = port
         self.session = session
+        # Tuning is read on every request so it can be changed while running
         self.retry = retry
+        self.timeout = timeout
+        self.timeout_floor = timeout_floor
+        # Timeout before any response was measured, so a dead controller is noticed early
+        self.timeout_initial = timeout_initial
+        self.deadline = deadline
+        self.coalesce = coalesce
+        # Longest quoted ?json= a write may use before it is split into several
+        self.max_query = max_query
+        # Extra writes allowed per batch to find the changes in a rejected chunk
+        self.max_bisect = max_bisect
+        # Seconds after an ack that snapshots still showing the old value are corrected
+        self.overlay_ttl = overlay_ttl
+        # Send a second poll when the first is slower than most, within a budget
+        self.hedge = hedge
+        self.hedge_budget = hedge_budget
+        self.polls = 0
+        self.hedged = 0
+        self.estimate = latency_estimate()
+        # Decode responses on this executor instead of the event loop when set
+        self.executor = executor
+        self.codec = codec
+        # Fields of getSystemData to keep, everything when None
+        self.projection = projection
+        # Responses at least this many bytes are processed on the executor, never when None
+        self.offload_threshold = offload_threshold
+        # Paths that changed in the last snapshot returned with overlay, None when unknown
+        self.changes = None
+        self._previous = None
+        # Paths the overlay set in the previous snapshot
+        self._overlaid = set()
+        # Seconds spent decoding, projecting and diffing, on the loop and on the executor
+        self.processing = {
+            "inline": collections.deque(maxlen=100),
+            "offloaded": collections.deque(maxlen=100),
+        }
+        # Called with the path, request and raw response body of every successful exchange
+        self.recorder = None
+        # Returns an async context manager held around each getSystemData request
+        self.limiter = None
+        # Seconds from ack until a snapshot showed the change, by field
+        self.convergence = collections.defaultdict(
+            lambda: collections.deque(maxlen=100)
+        )
+        self._confirm_poll = None
+
+        self.aircon = self.advantage_air_endpoint(self, "setAircon", ("aircons",))
+        self.lights = self.advantage_air_endpoint(
+            self, "setLights", ("myLights", "lights")
+        )
+        self.things = self.advantage_air_endpoint(
+            self, "setThings", ("myThings", "things")
+        )
+
+    def _timeout(self, end, estimate):
+        """Timeout for the next request from the latency estimate, limited by the remaining deadline
+
+        None when the deadline has passed and no request should be sent.
+        """
+        timeout = estimate.choose(self.timeout_floor, self.timeout, self.timeout_initial)
+        if end is None:
+            return aiohttp.ClientTimeout(total=timeout)
+        remaining = end - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            return None
+        return aiohttp.ClientTimeout(total=min(timeout, remaining))
 
-        self.aircon = self.advantage_air_endpoint(ip, port, session, retry, "setAircon")
-        self.lights = self.advantage_air_endpoint(ip, port, session, retry, "setLights")
-        self.things = self.advantage_air_endpoint(ip, port, session, retry, "setThings")
+    def _deadline(self):
+        """Loop time by which a request must complete, including its retries"""
+        if not self.deadline:
+            return None
+        return asyncio.get_running_loop().time() + self.deadline
 
-    async def async_get(self, retry=None):
+    async def async_get(self, retry=None, overlay=True):
+        """Fetch getSystemData, with pending changes applied on top unless overlay is False"""
         retry = retry or self.retry
+        end = self._deadline()
         data = {}
         count = 0
         error = None
         while count < retry:
             count += 1
             try:
-                async with self.session.get(
-                    f"http://{self.ip}:{self.port}/getSystemData",
-                    timeout=aiohttp.ClientTimeout(total=4),
-                ) as resp:
-                    assert resp.status == 200
-                    data = await resp.json(content_type=None)
-                    if "aircons" in data:
-                        return data
+                data, changes, body = await self._async_poll(
+                    end, self._previous if overlay else None
+                )
+                if "aircons" in data:
+                    if self.recorder:
+                        # As the controller sent it, before projection
+                        self.recorder("getSystemData", None, body)
+                    if overlay:
+                        overlaid = set()
+                        for endpoint in self.endpoints:
+                            overlaid |= endpoint.apply(data)
+                        # Later snapshots are diffed against this one as it was returned
+                        self.changes = self._overlay_changes(changes, data, overlaid)
+                        self._previous = data
+                        self._overlaid = overlaid
+                    return data
             except (
                 aiohttp.ClientError,
                 aiohttp.ClientConnectorError,
@@ -59,10 +379,12 @@ class advantage_air:
                 error = err
             except asyncio.TimeoutError:
                 error = "Connection timed out."
+                if end is not None and asyncio.get_running_loop().time() >= end:
+                    break
             except AssertionError:
                 error = "Response status not 200."
                 break
-            except SyntaxError as err:
+            except (SyntaxError, ValueError) as err:
                 error = "Invalid response"
                 break
 
@@ -71,51 +393,495 @@ class advantage_air:
             f"No valid response after {count} failed attempt{['','s'][count>1]}. Last error was: {error}"
         )
 
+    def _overlay_changes(self, changes, data, overlaid):
+        """Correct the diff of the controller's snapshot to the one returned with overlay
+
+        The controller's values were diffed against the previous returned snapshot,
+        so the paths overlaid now or last time are compared again as returned.
+        """
+        if changes is None:
+            return None
+        touched = overlaid | self._overlaid
+        if not touched:
+            return changes
+        return [path for path in changes if path not in touched] + [
+            path
+            for path in touched
+            if lookup(data, path) != lookup(self._previous, path)
+        ]
+
+    async def _async_poll(self, end, previous=None):
+        """Fetch the system data, hedging with a second request when it is slow"""
+        self.polls += 1
+        tasks = [asyncio.ensure_future(self._async_fetch(end, previous))]
+        try:
+            samples = self.estimate.samples
+            if self.hedge and len(samples) >= 20:
+                delay = sorted(samples)[len(samples) * 9 // 10]
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and self.hedged < self.hedge_budget * self.polls:
+                    self.hedged += 1
+                    tasks.append(asyncio.ensure_future(self._async_fetch(end, previous)))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # The first success wins, a failure only counts once all failed
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            return task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _async_fetch(self, end, previous=None):
+        """Fetch the system data once, returning it with the paths changed since previous and the body"""
+        loop = asyncio.get_running_loop()
+        # Only the request holds a slot, not the backoff between retries
+        async with self.limiter() if self.limiter else contextlib.nullcontext():
+            if (timeout := self._timeout(end, self.estimate)) is None:
+                # Out of time before sending, which says nothing about the latency
+                raise asyncio.TimeoutError
+            start = loop.time()
+            try:
+                async with self.session.get(
+                    f"http://{self.ip}:{self.port}/getSystemData", timeout=timeout
+                ) as resp:
+                    assert resp.status == 200
+                    body = await resp.read()
+            except asyncio.TimeoutError:
+                self.estimate.expired()
+                raise
+            self.estimate.sample(loop.time() - start)
+        # Large sites are processed off the event loop, small ones are not worth the hop
+        if (
+            self.executor is None
+            or self.offload_threshold is None
+            or len(body) < self.offload_threshold
+        ):
+            data, changes, elapsed = self._process(body, previous)
+            self.processing["inline"].append(elapsed)
+        else:
+            data, changes, elapsed = await loop.run_in_executor(
+                self.executor, self._process, body, previous
+            )
+            self.processing["offloaded"].append(elapsed)
+        return data, changes, body
+
+    def _process(self, body, previous):
+        """Decode, project and diff a response, so the full document never reaches the loop"""
+        start = time.perf_counter()
+        data = self.codec.loads(body)
+        if self.projection is not None:
+            data = project(data, self.projection)
+        changes = None if previous is None else diff(previous, data)
+        return data, changes, time.perf_counter() - start
+
+    async def async_confirm(self, leaves, timeout):
+        """Poll until a snapshot shows every leaf, recording how long each took
+
+        A failed poll is retried like one that did not show the change yet, the
+        write was acknowledged so only the timeout gives up on it.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        pending = dict(leaves)
+        delay = 0.25
+        error = None
+        while True:
+            # Confirmations waiting at the same time share each poll
+            if self._confirm_poll is None or self._confirm_poll.done():
+                self._confirm_poll = asyncio.ensure_future(self.async_get(1, False))
+            try:
+                data = await asyncio.shield(self._confirm_poll)
+            except ApiError as err:
+                data, error = None, err
+            now = loop.time()
+            if data is not None:
+                for (path, field), value in list(pending.items()):
+                    if lookup(data, path) == value:
+                        self.convergence[field].append(now - start)
+                        del pending[path, field]
+                if not pending:
+                    return data
+            if now + delay > start + timeout:
+                raise ApiError(
+                    f"Change to {', '.join(sorted({field for _, field in pending}))} not confirmed after {timeout} seconds."
+                    + (f" Last error was: {error}" if data is None else "")
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 2)
+
+    @property
+    def endpoints(self):
+        return (self.aircon, self.lights, self.things)
+
+    def start(self):
+        """Start the writer of every endpoint"""
+        for endpoint in self.endpoints:
+            endpoint.start()
+
+    async def async_stop(self, timeout=10):
+        """Send queued changes within timeout, then stop every writer"""
+        await asyncio.gather(*(endpoint.async_stop(timeout) for endpoint in self.endpoints))
+
     class advantage_air_endpoint:
-        def __init__(self, ip, port, session, retry, endpoint):
-            self.ip = ip
-            self.port = port
-            self.session = session
-            self.retry = retry
+        def __init__(self, api, endpoint, root):
+            self.api = api
             self.endpoint = endpoint
-            self.changes = {}
-            self.lock = asyncio.Lock()
+            # Where the changes of this endpoint show up in getSystemData
+            self.root = root
+            self.queue = asyncio.Queue()
+            self.task = None
+            self.inflight = []
+            self.estimate = latency_estimate()
+            # Changes merged and requests sent, their ratio is the merge factor
+            self.merged = 0
+            self.requests = 0
+            # Extra requests sent to isolate rejected changes
+            self.bisected = 0
+            # Value, write and expiry of changes the snapshots may not show yet, by path
+            self.overlay = {}
+            self._writes = 0
+
+        @property
+        def depth(self):
+            """Changes waiting to be sent or being sent"""
+            return self.queue.qsize() + len(self.inflight)
+
+        def start(self):
+            """Start the writer, which sends queued changes independent of their callers"""
+            if self.task is None or self.task.done():
+                self.task = asyncio.get_running_loop().create_task(self._async_writer())
+
+        async def async_stop(self, timeout):
+            """Send queued changes within timeout, then stop the writer"""
+            if self.task is None:
+                return
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self.task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.task
+            self.task = None
+            while not self.queue.empty():
+                flat, future, write = self.queue.get_nowait()
+                self.queue.task_done()
+                self._settle(flat, write, None)
+                if not future.done():
+                    future.set_exception(ApiError("Writer stopped."))
+
+        async def async_set(self, change, confirm=False, timeout=30):
+            """Queue a change for the writer, returning True when this caller should refresh.
+
+            With confirm, also wait until the controller reports every changed value.
+            """
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._writes += 1
+            write = self._writes
+            # The change is only walked here, the writer merges and sends its leaves
+            flat = dict(flatten(change))
+            paths = [
+                (self.root + path, value)
+                for path, value in flat.items()
+                if path[-1] != "id"
+            ]
+            for path, value in paths:
+                self.overlay[path] = [value, write, None]
+            self.queue.put_nowait((flat, future, write))
+            self.start()
+            # The writer settles the overlay, even when this caller is cancelled
+            refresh = await future
+            if confirm:
+                await self.api.async_confirm(
+                    {
+                        (path, self._field(path[len(self.root) :])): value
+                        for path, value in paths
+                    },
+                    timeout,
+                )
+            return refresh
+
+        def apply(self, data):
+            """Show pending changes in a snapshot until it reports them or they expire
+
+            Changes are pending while in flight, and for overlay_ttl after their ack
+            because a poll that started before the ack, or a slow controller, can
+            still report the old value.
+            Returns the paths that were set.
+            """
+            if not self.overlay:
+                return set()
+            applied = set()
+            now = asyncio.get_running_loop().time()
+            for path, (value, _, expires) in list(self.overlay.items()):
+                parent = lookup(data, path[:-1])
+                if not isinstance(parent, collections.abc.Mapping) or path[-1] not in parent:
+                    # The zone, light or thing is gone
+                    del self.overlay[path]
+                elif parent[path[-1]] == value or (expires is not None and now >= expires):
+                    del self.overlay[path]
+                else:
+                    parent[path[-1]] = value
+                    applied.add(path)
+            return applied
 
-        async def async_set(self, change):
-            """Merge changes with queue and send when possible, returning True when done"""
+        def _settle(self, flat, write, expires):
+            """Expire the pending changes of a sent write, or drop them with None when it failed
 
-            self.changes = update(self.changes, change)
-            if self.lock.locked():
-                return False
-            async with self.lock:
-                while self.changes:
+            Leaves a newer write replaced are left alone.
+            """
+            for path in flat:
+                if path[-1] == "id":
+                    continue
+                entry = self.overlay.get(self.root + path)
+                if entry is None or entry[1] != write:
+                    continue
+                if expires is None:
+                    del self.overlay[self.root + path]
+                else:
+                    entry[2] = expires
+
+        def _field(self, path):
+            """Name a changed leaf without the ids of the aircon, zone, light or thing"""
+            path = path[1:]
+            if path[0] == "zones":
+                path = path[:1] + path[2:]
+            return f"{self.endpoint}:{'.'.join(path)}"
+
+        def _collect(self):
+            """Take everything queued so far"""
+            items = []
+            while not self.queue.empty():
+                items.append(self.queue.get_nowait())
+            return items
+
+        async def _async_writer(self):
+            while True:
+                self.inflight = [await self.queue.get()]
+                try:
                     # Allow any addition changes from the event loop to be collected
-                    await asyncio.sleep(0)
-                    # Collect all changes
-                    payload = self.changes
-                    self.changes = {}
+                    await asyncio.sleep(self.api.coalesce)
+                    self.inflight += self._collect()
+                    self.merged += len(self.inflight)
+                    errors = await self._async_dispatch()
+                except asyncio.CancelledError:
+                    self._resolve(ApiError("Writer stopped."))
+                    raise
+                except Exception as err:
+                    self._resolve(err)
+                else:
+                    self._resolve(errors=errors)
+                finally:
+                    for _ in self.inflight:
+                        self.queue.task_done()
+                    self.inflight = []
+
+        async def _async_dispatch(self):
+            """Send the in flight changes in chunks that fit the query limit
+
+            Returns the error of each in flight change that was not applied, by index.
+            A rejected chunk is bisected to apply the rest of it and only fail the
+            changes the controller refused, any other error also fails the chunks
+            that were not sent yet.
+            """
+            # The latest write of each leaf wins, with its write number for ordering
+            buffer = {}
+            for flat, _, write in self.inflight:
+                for path, value in flat.items():
+                    if path not in buffer or buffer[path][1] < write:
+                        buffer[path] = (value, write)
+            changed = [
+                {path for path in flat if path[-1] != "id"}
+                for flat, _, _ in self.inflight
+            ]
+            payload = nest({path: value for path, (value, _) in buffer.items()})
+            chunks = split(payload, self.api.max_query, self.api.codec.dumps)
+            applied = set()
+            errors = {}
+
+            def fail(chunk, error):
+                paths = leaves(chunk) - applied
+                for index, item in enumerate(changed):
+                    if index not in errors and item & paths:
+                        errors[index] = error
+
+            budget = self.api.max_bisect
+            for index, chunk in enumerate(chunks):
+                try:
                     try:
-                        async with self.session.get(
-                            f"http://{self.ip}:{self.port}/{self.endpoint}",
-                            params={"json": json.dumps(payload)},
-                            timeout=aiohttp.ClientTimeout(total=4),
-                        ) as resp:
-                            data = await resp.json(content_type=None)
-                        if data["ack"] == False:
-                            raise ApiError(data["reason"])
-                    except (
-                        aiohttp.client_exceptions.ServerDisconnectedError,
-                        ConnectionResetError,
-                    ) as err:
-                        # Recoverable error, reinsert the changes and try again in a second
-                        self.changes = update(self.changes, payload)
-                        await asyncio.sleep(1)
-                    except aiohttp.ClientError as err:
-                        raise ApiError(err)
-                    except asyncio.TimeoutError:
-                        raise ApiError("Connection timed out.")
-                    except AssertionError:
-                        raise ApiError("Response status not 200.")
-                    except SyntaxError as err:
-                        raise ApiError("Invalid response")
-            return True
+                        await self._async_send(chunk)
+                    except ApiRejected as err:
+                        budget = await self._async_isolate(chunk, err, budget, applied, fail)
+                except ApiError as err:
+                    for rest in chunks[index:]:
+                        fail(rest, err)
+                    break
+            return errors
+
+        async def _async_isolate(self, chunk, error, budget, applied, fail):
+            """Send halves of a rejected chunk until the refused changes are found
+
+            Halves are split along aircons, zones, lights, things and then fields.
+            Once the budget of extra requests runs out, what is left fails as a whole.
+            Returns the remaining budget.
+            """
+            pending = [(chunk, error)]
+            sent = 0
+            while pending:
+                piece, error = pending.pop(0)
+                pieces = parts(piece)
+                if len(pieces) == 1 or budget < 2:
+                    fail(piece, error)
+                    _LOGGER.warning("%s rejected %s: %s", self.endpoint, piece, error)
+                    continue
+                half = len(pieces) // 2
+                for group in (pieces[:half], pieces[half:]):
+                    part = {}
+                    for p in group:
+                        update(part, p)
+                    budget -= 1
+                    sent += 1
+                    self.bisected += 1
+                    try:
+                        await self._async_send(part)
+                        applied.update(leaves(part))
+                    except ApiRejected as err:
+                        pending.append((part, err))
+            if sent:
+                _LOGGER.info(
+                    "%s isolated rejected changes with %s extra requests", self.endpoint, sent
+                )
+            return budget
+
+        def _resolve(self, error=None, errors=None):
+            """Tell the callers of the in flight changes how they went, only the first success refreshes"""
+            refresh = True
+            # Snapshots get the benefit of the doubt for a while after the ack
+            expires = asyncio.get_running_loop().time() + self.api.overlay_ttl
+            for index, (flat, future, write) in enumerate(self.inflight):
+                failure = error or (errors or {}).get(index)
+                self._settle(flat, write, None if failure else expires)
+                if future.done():
+                    continue
+                if failure is None:
+                    future.set_result(refresh)
+                    refresh = False
+                else:
+                    future.set_exception(failure)
+
+        async def _async_send(self, payload):
+            end = self.api._deadline()
+            while True:
+                if (timeout := self.api._timeout(end, self.estimate)) is None:
+                    raise ApiError("Connection timed out.")
+                self.requests += 1
+                start = asyncio.get_running_loop().time()
+                try:
+                    async with self.api.session.get(
+                        f"http://{self.api.ip}:{self.api.port}/{self.endpoint}",
+                        params={"json": self.api.codec.dumps(payload)},
+                        timeout=timeout,
+                    ) as resp:
+                        body = await resp.read()
+                    self.estimate.sample(asyncio.get_running_loop().time() - start)
+                    data = self.api.codec.loads(body)
+                    if self.api.recorder:
+                        self.api.recorder(self.endpoint, payload, body)
+                    if data["ack"] == False:
+                        raise ApiRejected(data["reason"])
+                    return
+                except (
+                    aiohttp.client_exceptions.ServerDisconnectedError,
+                    ConnectionResetError,
+                ) as err:
+                    # Recoverable error, try again in a second.
+                    # Changes queued meanwhile go in the next batch so chunks keep their size.
+                    await asyncio.sleep(1)
+                except aiohttp.ClientError as err:
+                    raise ApiError(err)
+                except asyncio.TimeoutError:
+                    self.estimate.expired()
+                    raise ApiError("Connection timed out.")
+                except AssertionError:
+                    raise ApiError("Response status not 200.")
+                except (SyntaxError, ValueError) as err:
+                    raise ApiError("Invalid response")
+
+
+def load_recording(path):
+    """Read a recording of controller exchanges, one JSON object per line
+
+    Responses are encoded back to bodies here, so replaying them costs no more
+    than reading them off the network.
+    """
+    records = []
+    with gzip.open(path, "rt") as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                record["response"] = json.dumps(record["response"]).encode()
+                records.append(record)
+    return records
+
+
+class replay_session:
+    """Stand-in for an aiohttp session that answers from a recording"""
+
+    def __init__(self, records, realtime=False):
+        self.polls = collections.deque(
+            record for record in records if record["path"] == "getSystemData"
+        )
+        self.replies = collections.defaultdict(collections.deque)
+        for record in records:
+            if record["path"] != "getSystemData":
+                self.replies[record["path"]].append(record["response"])
+        self.realtime = realtime
+        self.origin = self.polls[0]["t"] if self.polls else 0
+        self.start = None
+
+    def get(self, url, params=None, timeout=None):
+        return self._respond(url.rsplit("/", 1)[-1])
+
+    @contextlib.asynccontextmanager
+    async def _respond(self, path):
+        if path != "getSystemData":
+            replies = self.replies[path]
+            yield replay_response(replies.popleft() if replies else b'{"ack":true}')
+            return
+        if not self.polls:
+            raise ApiError("End of recording")
+        record = self.polls.popleft()
+        if self.realtime:
+            # Keep the recorded spacing between polls
+            loop = asyncio.get_running_loop()
+            if self.start is None:
+                self.start = loop.time()
+            await asyncio.sleep(self.start + record["t"] - self.origin - loop.time())
+        yield replay_response(record["response"])
+
+
+class replay_response:
+    """Recorded response body to a single request"""
+
+    status = 200
+
+    def __init__(self, body):
+        self.body = body
+
+    async def json(self, content_type=None):
+        return json.loads(self.body)
+
+    async def read(self):
+        return self.body
+
+
+def percentile(samples, fraction):
+    """Nearest rank percentile of some samples"""
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
@@ -1,6 +1,8 @@
 """Binary Sensor platform for Advantage Air integration."""
 from __future__ import annotations
 
+from functools import partial
+
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
@@ -10,8 +12,16 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN as ADVANTAGE_AIR_DOMAIN
-from .entity import AdvantageAirAcEntity, AdvantageAirZoneEntity
+from .const import (
+    ADVANTAGE_AIR_MOTION_STALENESS,
+    ADVANTAGE_AIR_SLOW_STALENESS,
+    DOMAIN as ADVANTAGE_AIR_DOMAIN,
+)
+from .entity import (
+    AdvantageAirAcEntity,
+    AdvantageAirZoneEntity,
+    async_setup_dynamic_entities,
+)
 
 PARALLEL_UPDATES = 0
 
@@ -25,18 +35,27 @@ async def async_setup_entry(
 
     instance = hass.data[ADVANTAGE_AIR_DOMAIN][config_entry.entry_id]
 
-    entities: list[BinarySensorEntity] = []
-    if "aircons" in instance["coordinator"].data:
-        for ac_key, ac_device in instance["coordinator"].data["aircons"].items():
-            entities.append(AdvantageAirFilter(instance, ac_key))
-            for zone_key, zone in ac_device["zones"].items():
-                # Only add motion sensor when motion is enabled
-                if zone["motionConfig"] >= 2:
-                    entities.append(AdvantageAirZoneMotion(instance, ac_key, zone_key))
-                # Only add MyZone if it is available
-                if zone["type"] != 0:
-                    entities.append(AdvantageAirZoneMyZone(instance, ac_key, zone_key))
-    async_add_entities(entities)
+    def discover(data):
+        entities = {}
+        if "aircons" in data:
+            for ac_key, ac_device in data["aircons"].items():
+                entities[("filter", ac_key)] = partial(
+                    AdvantageAirFilter, instance, ac_key
+                )
+                for zone_key, zone in ac_device["zones"].items():
+                    # Only add motion sensor when motion is enabled
+                    if zone["motionConfig"] >= 2:
+                        entities[("motion", ac_key, zone_key)] = partial(
+                            AdvantageAirZoneMotion, instance, ac_key, zone_key
+                        )
+                    # Only add MyZone if it is available
+                    if zone["type"] != 0:
+                        entities[("myzone", ac_key, zone_key)] = partial(
+                            AdvantageAirZoneMyZone, instance, ac_key, zone_key
+                        )
+        return entities
+
+    async_setup_dynamic_entities(hass, config_entry, async_add_entities, discover)
 
 
 class AdvantageAirFilter(AdvantageAirAcEntity, BinarySensorEntity):
@@ -45,6 +64,7 @@ class AdvantageAirFilter(AdvantageAirAcEntity, BinarySensorEntity):
     _attr_device_class = BinarySensorDeviceClass.PROBLEM
     _attr_entity_category = EntityCategory.DIAGNOSTIC
     _attr_name = "Filter"
+    _max_staleness = ADVANTAGE_AIR_SLOW_STALENESS
 
     def __init__(self, instance, ac_key):
         """Initialize an Advantage Air Filter sensor."""
@@ -61,11 +81,12 @@ class AdvantageAirZoneMotion(AdvantageAirZoneEntity, BinarySensorEntity):
     """Advantage Air Zone Motion sensor."""
 
     _attr_device_class = BinarySensorDeviceClass.MOTION
+    _zone_name_format = "{} motion"
+    _max_staleness = ADVANTAGE_AIR_MOTION_STALENESS
 
     def __init__(self, instance, ac_key, zone_key):
         """Initialize an Advantage Air Zone Motion sensor."""
         super().__init__(instance, ac_key, zone_key)
-        self._attr_name = f'{self._zone["name"]} motion'
         self._attr_unique_id += "-motion"
 
     @property
@@ -79,11 +100,11 @@ class AdvantageAirZoneMyZone(AdvantageAirZoneEntity, BinarySensorEntity):
 
     _attr_entity_registry_enabled_default = False
     _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _zone_name_format = "{} myZone"
 
     def __init__(self, instance, ac_key, zone_key):
         """Initialize an Advantage Air Zone MyZone sensor."""
         super().__init__(instance, ac_key, zone_key)
-        self._attr_name = f'{self._zone["name"]} myZone'
         self._attr_unique_id += "-myzone"
 
     @property
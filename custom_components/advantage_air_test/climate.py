@@ -1,6 +1,7 @@
 """Climate platform for Advantage Air integration."""
 from __future__ import annotations
 
+from functools import partial
 import logging
 
 from homeassistant.components.climate import ClimateEntity
@@ -16,7 +17,7 @@ from homeassistant.components.climate.const import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_TEMPERATURE, PRECISION_WHOLE, TEMP_CELSIUS
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
@@ -26,7 +27,12 @@ from .const import (
     ADVANTAGE_AIR_STATE_OPEN,
     DOMAIN as ADVANTAGE_AIR_DOMAIN,
 )
-from .entity import AdvantageAirAcEntity, AdvantageAirZoneEntity
+from .entity import (
+    AdvantageAirAcEntity,
+    AdvantageAirZoneEntity,
+    async_setup_dynamic_entities,
+    snapshot_property,
+)
 
 ADVANTAGE_AIR_HVAC_MODES = {
     "heat": HVACMode.HEAT,
@@ -46,6 +52,13 @@ ADVANTAGE_AIR_FAN_MODES = {
 HASS_FAN_MODES = {v: k for k, v in ADVANTAGE_AIR_FAN_MODES.items()}
 FAN_SPEEDS = {FAN_LOW: 30, FAN_MEDIUM: 60, FAN_HIGH: 100}
 
+# Shared between all entities, so they must never be modified
+HVAC_MODES_MYTEMP = (HVACMode.OFF, HVACMode.COOL, HVACMode.HEAT)
+HVAC_MODES_MYZONE = HVAC_MODES_MYTEMP + (HVACMode.FAN_ONLY, HVACMode.DRY)
+HVAC_MODES_MYAUTO = HVAC_MODES_MYZONE + (HVACMode.HEAT_COOL,)
+FAN_MODES = (FAN_LOW, FAN_MEDIUM, FAN_HIGH)
+FAN_MODES_AUTO = FAN_MODES + (FAN_AUTO,)
+
 ADVANTAGE_AIR_AUTOFAN = "aaAutoFanModeEnabled"
 ADVANTAGE_AIR_MYZONE = "MyZone"
 ADVANTAGE_AIR_MYAUTO = "MyAuto"
@@ -69,21 +82,26 @@ async def async_setup_entry(
 
     instance = hass.data[ADVANTAGE_AIR_DOMAIN][config_entry.entry_id]
 
-    entities: list[ClimateEntity] = []
-    if "aircons" in instance["coordinator"].data:
-        for ac_key, ac_device in instance["coordinator"].data["aircons"].items():
-            entities.append(AdvantageAirAC(instance, ac_key))
-            for zone_key, zone in ac_device["zones"].items():
-                # Only add zone climate control when zone is in temperature control
-                if zone["type"] != 0:
-                    entities.append(AdvantageAirZone(instance, ac_key, zone_key))
-    async_add_entities(entities)
+    def discover(data):
+        entities = {}
+        if "aircons" in data:
+            for ac_key, ac_device in data["aircons"].items():
+                entities[("ac", ac_key)] = partial(AdvantageAirAC, instance, ac_key)
+                for zone_key, zone in ac_device["zones"].items():
+                    # Only add zone climate control when zone is in temperature control
+                    if zone["type"] != 0:
+                        entities[("zone", ac_key, zone_key)] = partial(
+                            AdvantageAirZone, instance, ac_key, zone_key
+                        )
+        return entities
+
+    async_setup_dynamic_entities(hass, config_entry, async_add_entities, discover)
 
 
 class AdvantageAirAC(AdvantageAirAcEntity, ClimateEntity):
     """AdvantageAir AC unit."""
 
-    _attr_fan_modes = [FAN_LOW, FAN_MEDIUM, FAN_HIGH]
+    _attr_fan_modes = FAN_MODES
     _attr_temperature_unit = TEMP_CELSIUS
     _attr_target_temperature_step = PRECISION_WHOLE
     _attr_max_temp = 32
@@ -95,8 +113,17 @@ class AdvantageAirAC(AdvantageAirAcEntity, ClimateEntity):
     def __init__(self, instance, ac_key):
         """Initialize an AdvantageAir AC unit."""
         super().__init__(instance, ac_key)
-        self._attr_unique_id = f'{self.coordinator.data["system"]["rid"]}-{ac_key}'
+        self._attr_unique_id = f'{instance["rid"]}-{ac_key}'
+        self._update_presets()
 
+    @callback
+    def async_topology_updated(self) -> None:
+        """Follow renames and changes to the available presets."""
+        super().async_topology_updated()
+        self._update_presets()
+
+    def _update_presets(self) -> None:
+        """Derive the preset modes from the features of the aircon."""
         self._attr_preset_modes = [ADVANTAGE_AIR_MYZONE]
         self._attr_supported_features = ClimateEntityFeature.FAN_MODE
 
@@ -115,37 +142,24 @@ class AdvantageAirAC(AdvantageAirAcEntity, ClimateEntity):
         """Return the current target temperature."""
         return self._ac["setTemp"]
 
-    @property
+    @snapshot_property("_ac", "state", "mode")
     def hvac_mode(self) -> HVACMode:
         """Return the current HVAC modes."""
         if self._ac["state"] == ADVANTAGE_AIR_STATE_ON:
             return ADVANTAGE_AIR_HVAC_MODES[self._ac["mode"]]
         return HVACMode.OFF
 
-    @property
-    def hvac_modes(self) -> list[HVACMode]:
+    @snapshot_property("_ac", ADVANTAGE_AIR_MYTEMP_ENABLED, ADVANTAGE_AIR_MYAUTO_ENABLED)
+    def hvac_modes(self) -> tuple[HVACMode, ...]:
         """Return the available HVAC modes."""
         # MyTemp only supports cooling and heating
         if self._ac.get(ADVANTAGE_AIR_MYTEMP_ENABLED):
-            return [HVACMode.OFF, HVACMode.COOL, HVACMode.HEAT]
+            return HVAC_MODES_MYTEMP
         # MyAuto adds support for Auto
         if self._ac.get(ADVANTAGE_AIR_MYAUTO_ENABLED):
-            return [
-                HVACMode.OFF,
-                HVACMode.COOL,
-                HVACMode.HEAT,
-                HVACMode.FAN_ONLY,
-                HVACMode.DRY,
-                HVACMode.HEAT_COOL,
-            ]
+            return HVAC_MODES_MYAUTO
         # MyZone does not support auto
-        return [
-            HVACMode.OFF,
-            HVACMode.COOL,
-            HVACMode.HEAT,
-            HVACMode.FAN_ONLY,
-            HVACMode.DRY,
-        ]
+        return HVAC_MODES_MYZONE
 
     @property
     def fan_mode(self) -> str | None:
@@ -153,14 +167,14 @@ class AdvantageAirAC(AdvantageAirAcEntity, ClimateEntity):
         return ADVANTAGE_AIR_FAN_MODES.get(self._ac["fan"])
 
     @property
-    def fan_modes(self) -> list[str] | None:
+    def fan_modes(self) -> tuple[str, ...] | None:
         """Return the list of available fan modes."""
         # Auto is only available when AutoFan is enabled
         if self._ac.get(ADVANTAGE_AIR_AUTOFAN):
-            return self._attr_fan_modes + [FAN_AUTO]
+            return FAN_MODES_AUTO
         return self._attr_fan_modes
 
-    @property
+    @snapshot_property("_ac", ADVANTAGE_AIR_MYTEMP_ENABLED, ADVANTAGE_AIR_MYAUTO_ENABLED)
     def preset_mode(self) -> str:
         """Return the current preset mode."""
         if self._ac.get(ADVANTAGE_AIR_MYAUTO_ENABLED):
@@ -169,7 +183,13 @@ class AdvantageAirAC(AdvantageAirAcEntity, ClimateEntity):
             return ADVANTAGE_AIR_MYTEMP
         return ADVANTAGE_AIR_MYZONE
 
-    @property
+    @snapshot_property(
+        "_ac",
+        ADVANTAGE_AIR_MYTEMP_ENABLED,
+        ADVANTAGE_AIR_MYAUTO_ENABLED,
+        "state",
+        "mode",
+    )
     def supported_features(self) -> int:
         """Return the list of supported features."""
         # MyTemp does not support setting a temperature of any kind
@@ -255,7 +275,7 @@ class AdvantageAirZone(AdvantageAirZoneEntity, ClimateEntity):
     _attr_target_temperature_step = PRECISION_WHOLE
     _attr_max_temp = 32
     _attr_min_temp = 16
-    _attr_hvac_modes = [HVACMode.OFF, HVACMode.HEAT_COOL]
+    _attr_hvac_modes = (HVACMode.OFF, HVACMode.HEAT_COOL)
     _attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
     _attr_temperature_unit = TEMP_CELSIUS
     _attr_target_temperature_step = PRECISION_WHOLE
@@ -265,10 +285,7 @@ class AdvantageAirZone(AdvantageAirZoneEntity, ClimateEntity):
     def __init__(self, instance, ac_key, zone_key) -> None:
         """Initialize an AdvantageAir Zone control."""
         super().__init__(instance, ac_key, zone_key)
-        self._attr_name = self._zone["name"]
-        self._attr_unique_id = (
-            f'{self.coordinator.data["system"]["rid"]}-{ac_key}-{zone_key}'
-        )
+        self._attr_unique_id = f'{instance["rid"]}-{ac_key}-{zone_key}'
 
     @property
     def hvac_mode(self) -> HVACMode:
@@ -1,19 +1,51 @@
 """Config Flow for Advantage Air integration."""
 from __future__ import annotations
 
+import ipaddress
 from typing import Any
 
-from .advantage_air import ApiError, advantage_air
+from .advantage_air import ApiError, advantage_air, async_discover
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.components import network
 from homeassistant.const import CONF_IP_ADDRESS, CONF_PORT
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import ADVANTAGE_AIR_RETRY, DOMAIN
+from .const import (
+    ADVANTAGE_AIR_COALESCE,
+    ADVANTAGE_AIR_CONFIRM_TIMEOUT,
+    ADVANTAGE_AIR_DEADLINE,
+    ADVANTAGE_AIR_MAX_QUERY,
+    ADVANTAGE_AIR_OFFLOAD_ALWAYS,
+    ADVANTAGE_AIR_OFFLOAD_AUTO,
+    ADVANTAGE_AIR_OFFLOAD_NEVER,
+    ADVANTAGE_AIR_RETRY,
+    ADVANTAGE_AIR_SYNC_INTERVAL,
+    ADVANTAGE_AIR_TIMEOUT,
+    ADVANTAGE_AIR_TIMEOUT_FLOOR,
+    CONF_COALESCE,
+    CONF_CONFIRM,
+    CONF_CONFIRM_TIMEOUT,
+    CONF_DEADLINE,
+    CONF_FULL_DOCUMENT,
+    CONF_HEDGE,
+    CONF_MAX_QUERY,
+    CONF_OFFLOAD,
+    CONF_PROXY,
+    CONF_PROXY_WRITE,
+    CONF_RETRY,
+    CONF_SYNC_INTERVAL,
+    CONF_TIMEOUT,
+    CONF_TIMEOUT_FLOOR,
+    DOMAIN,
+)
 
 ADVANTAGE_AIR_DEFAULT_PORT = 2025
+# Larger networks are only scanned in the /24 around our own address
+ADVANTAGE_AIR_SCAN_MIN_PREFIX = 22
 
 ADVANTAGE_AIR_SCHEMA = vol.Schema(
     {
@@ -30,8 +62,92 @@ class AdvantageAirConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     DOMAIN = DOMAIN
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> AdvantageAirOptionsFlow:
+        """Get the options flow for this handler."""
+        return AdvantageAirOptionsFlow(config_entry)
+
+    def __init__(self) -> None:
+        """Initialize the config flow."""
+        self._discovered: dict[str, dict[str, Any]] = {}
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Let the user choose between scanning the network and manual entry."""
+        return self.async_show_menu(step_id="user", menu_options=["scan", "manual"])
+
+    async def async_step_scan(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Scan the local networks and let the user pick a controller."""
+        if user_input:
+            ip_address = user_input[CONF_IP_ADDRESS]
+            system = self._discovered[ip_address]
+            await self.async_set_unique_id(system["rid"])
+            self._abort_if_unique_id_configured()
+
+            return self.async_create_entry(
+                title=system["name"],
+                data={
+                    CONF_IP_ADDRESS: ip_address,
+                    CONF_PORT: ADVANTAGE_AIR_DEFAULT_PORT,
+                },
+            )
+
+        configured = self._async_current_ids()
+        self._discovered = {
+            host: system
+            for host, system in (
+                await async_discover(
+                    await self._async_scan_hosts(),
+                    port=ADVANTAGE_AIR_DEFAULT_PORT,
+                    session=async_get_clientsession(self.hass),
+                )
+            ).items()
+            if system["rid"] not in configured
+        }
+        if not self._discovered:
+            return self.async_abort(reason="no_devices_found")
+
+        return self.async_show_form(
+            step_id="scan",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_IP_ADDRESS): vol.In(
+                        {
+                            host: f"{system['name']} ({system['rid']}, {host})"
+                            for host, system in self._discovered.items()
+                        }
+                    )
+                }
+            ),
+        )
+
+    async def _async_scan_hosts(self) -> list[ipaddress.IPv4Address]:
+        """Return every host address on the enabled IPv4 networks."""
+        hosts: set[ipaddress.IPv4Address] = set()
+        for adapter in await network.async_get_adapters(self.hass):
+            if not adapter["enabled"]:
+                continue
+            for ip_info in adapter["ipv4"]:
+                interface = ipaddress.ip_interface(
+                    f"{ip_info['address']}/{ip_info['network_prefix']}"
+                )
+                if interface.is_loopback or interface.is_link_local:
+                    continue
+                subnet = interface.network
+                if subnet.prefixlen < ADVANTAGE_AIR_SCAN_MIN_PREFIX:
+                    subnet = ipaddress.ip_interface(f"{interface.ip}/24").network
+                hosts.update(subnet.hosts())
+                hosts.discard(interface.ip)
+        return sorted(hosts)
+
+    async def async_step_manual(
+        self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Get configuration from the user."""
         errors = {}
@@ -58,7 +174,95 @@ class AdvantageAirConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 )
 
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=ADVANTAGE_AIR_SCHEMA,
             errors=errors,
         )
+
+
+class AdvantageAirOptionsFlow(config_entries.OptionsFlow):
+    """Tune polling and the Advantage Air API connection."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the tuning options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_SYNC_INTERVAL,
+                        default=options.get(
+                            CONF_SYNC_INTERVAL, ADVANTAGE_AIR_SYNC_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                    vol.Optional(
+                        CONF_RETRY,
+                        default=options.get(CONF_RETRY, ADVANTAGE_AIR_RETRY),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+                    vol.Optional(
+                        CONF_TIMEOUT,
+                        default=options.get(CONF_TIMEOUT, ADVANTAGE_AIR_TIMEOUT),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0.5, max=60)),
+                    vol.Optional(
+                        CONF_TIMEOUT_FLOOR,
+                        default=options.get(
+                            CONF_TIMEOUT_FLOOR, ADVANTAGE_AIR_TIMEOUT_FLOOR
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=60)),
+                    vol.Optional(
+                        CONF_DEADLINE,
+                        default=options.get(CONF_DEADLINE, ADVANTAGE_AIR_DEADLINE),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=1, max=600)),
+                    vol.Optional(
+                        CONF_COALESCE,
+                        default=options.get(CONF_COALESCE, ADVANTAGE_AIR_COALESCE),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+                    vol.Optional(
+                        CONF_MAX_QUERY,
+                        default=options.get(CONF_MAX_QUERY, ADVANTAGE_AIR_MAX_QUERY),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=200, max=65536)),
+                    vol.Optional(
+                        CONF_HEDGE, default=options.get(CONF_HEDGE, False)
+                    ): bool,
+                    vol.Optional(
+                        CONF_CONFIRM, default=options.get(CONF_CONFIRM, False)
+                    ): bool,
+                    vol.Optional(
+                        CONF_CONFIRM_TIMEOUT,
+                        default=options.get(
+                            CONF_CONFIRM_TIMEOUT, ADVANTAGE_AIR_CONFIRM_TIMEOUT
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=1, max=300)),
+                    vol.Optional(
+                        CONF_OFFLOAD,
+                        default=options.get(CONF_OFFLOAD, ADVANTAGE_AIR_OFFLOAD_AUTO),
+                    ): vol.In(
+                        [
+                            ADVANTAGE_AIR_OFFLOAD_AUTO,
+                            ADVANTAGE_AIR_OFFLOAD_ALWAYS,
+                            ADVANTAGE_AIR_OFFLOAD_NEVER,
+                        ]
+                    ),
+                    vol.Optional(
+                        CONF_FULL_DOCUMENT,
+                        default=options.get(CONF_FULL_DOCUMENT, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_PROXY, default=options.get(CONF_PROXY, False)
+                    ): bool,
+                    vol.Optional(
+                        CONF_PROXY_WRITE, default=options.get(CONF_PROXY_WRITE, False)
+                    ): bool,
+                }
+            ),
+        )
@@ -1,7 +1,55 @@
 """Constants used by Advantage Air integration."""
 DOMAIN = "advantage_air_test"
 ADVANTAGE_AIR_RETRY = 10
+ADVANTAGE_AIR_SYNC_INTERVAL = 15
+ADVANTAGE_AIR_TIMEOUT = 20
+ADVANTAGE_AIR_TIMEOUT_FLOOR = 1
+ADVANTAGE_AIR_DEADLINE = 60
+ADVANTAGE_AIR_COALESCE = 0
+ADVANTAGE_AIR_MAX_QUERY = 2000
+ADVANTAGE_AIR_OVERLAY_TTL = 10
+ADVANTAGE_AIR_OFFLOAD_THRESHOLD = 65536
+ADVANTAGE_AIR_OFFLOAD_AUTO = "auto"
+ADVANTAGE_AIR_OFFLOAD_ALWAYS = "always"
+ADVANTAGE_AIR_OFFLOAD_NEVER = "never"
+ADVANTAGE_AIR_MOTION_STALENESS = 5
+ADVANTAGE_AIR_SLOW_STALENESS = 3600
+ADVANTAGE_AIR_DRAIN_TIMEOUT = 10
+ADVANTAGE_AIR_CONFIRM_TIMEOUT = 30
+ADVANTAGE_AIR_MAX_CONCURRENT_POLLS = 4
+ADVANTAGE_AIR_HEDGE_BUDGET = 0.05
+ADVANTAGE_AIR_RUNTIME_MAX_GAP = 300
+ADVANTAGE_AIR_RUNTIME_GAP_POLLS = 3
+ADVANTAGE_AIR_RUNTIME_SAVE_DELAY = 60
+# Fields of getSystemData the integration uses, True keeps a whole subtree
+ADVANTAGE_AIR_PROJECTION = {
+    "aircons": True,
+    "myLights": {"lights": True},
+    "myThings": {"things": True},
+    "system": {
+        "name": True,
+        "rid": True,
+        "sysType": True,
+        "myAppRev": True,
+        "needsUpdate": True,
+    },
+}
 ADVANTAGE_AIR_STATE_OPEN = "open"
 ADVANTAGE_AIR_STATE_CLOSE = "close"
 ADVANTAGE_AIR_STATE_ON = "on"
 ADVANTAGE_AIR_STATE_OFF = "off"
+
+CONF_SYNC_INTERVAL = "sync_interval"
+CONF_RETRY = "retry"
+CONF_TIMEOUT = "timeout"
+CONF_TIMEOUT_FLOOR = "timeout_floor"
+CONF_DEADLINE = "deadline"
+CONF_COALESCE = "coalesce"
+CONF_FULL_DOCUMENT = "full_document"
+CONF_HEDGE = "hedge"
+CONF_MAX_QUERY = "max_query"
+CONF_OFFLOAD = "offload"
+CONF_CONFIRM = "confirm"
+CONF_CONFIRM_TIMEOUT = "confirm_timeout"
+CONF_PROXY = "proxy"
+CONF_PROXY_WRITE = "proxy_write"
@@ -1,4 +1,5 @@
 """Cover platform for Advantage Air integration."""
+from functools import partial
 from typing import Any
 
 from homeassistant.components.cover import (
@@ -9,7 +10,7 @@ from homeassistant.components.cover import (
     CoverEntityFeature,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
@@ -17,12 +18,22 @@ from .const import (
     ADVANTAGE_AIR_STATE_OPEN,
     DOMAIN as ADVANTAGE_AIR_DOMAIN,
 )
-from .entity import AdvantageAirThingEntity, AdvantageAirZoneEntity
+from .entity import (
+    AdvantageAirThingEntity,
+    AdvantageAirZoneEntity,
+    async_setup_dynamic_entities,
+)
 
 PARALLEL_UPDATES = 0
 
 BLIND = CoverEntityDescription(key="blind", device_class=CoverDeviceClass.BLIND)
 GARAGE = CoverEntityDescription(key="garage", device_class=CoverDeviceClass.GARAGE)
+# Description of each thing type that is a cover, by channelDipState
+THING_COVERS = {
+    1: BLIND,  # Blind
+    2: BLIND,  # Blind 2
+    3: GARAGE,  # Garage door
+}
 
 
 async def async_setup_entry(
@@ -34,21 +45,25 @@ async def async_setup_entry(
 
     instance = hass.data[ADVANTAGE_AIR_DOMAIN][config_entry.entry_id]
 
-    entities: list[CoverEntity] = []
-    if "aircons" in instance["coordinator"].data:
-        for ac_key, ac_device in instance["coordinator"].data["aircons"].items():
-            for zone_key, zone in ac_device["zones"].items():
-                # Only add zone vent controls when zone in vent control mode.
-                if zone["type"] == 0:
-                    entities.append(AdvantageAirZoneVent(instance, ac_key, zone_key))
-    if "myThings" in instance["coordinator"].data:
-        for thing in instance["coordinator"].data["myThings"]["things"].values():
-            if thing["channelDipState"] in [1, 2]:  # 1 = "Blind", 2 = "Blind 2"
-                entities.append(AdvantageAirThingCover(instance, thing, BLIND))
-            elif thing["channelDipState"] == 3:  # 3 = "Garage door"
-                entities.append(AdvantageAirThingCover(instance, thing, GARAGE))
-
-    async_add_entities(entities)
+    def discover(data):
+        entities = {}
+        if "aircons" in data:
+            for ac_key, ac_device in data["aircons"].items():
+                for zone_key, zone in ac_device["zones"].items():
+                    # Only add zone vent controls when zone in vent control mode.
+                    if zone["type"] == 0:
+                        entities[("vent", ac_key, zone_key)] = partial(
+                            AdvantageAirZoneVent, instance, ac_key, zone_key
+                        )
+        if "myThings" in data:
+            for thing in data["myThings"]["things"].values():
+                if thing["channelDipState"] in THING_COVERS:
+                    entities[("thing", thing["id"])] = partial(
+                        AdvantageAirThingCover, instance, thing
+                    )
+        return entities
+
+    async_setup_dynamic_entities(hass, config_entry, async_add_entities, discover)
 
 
 class AdvantageAirZoneVent(AdvantageAirZoneEntity, CoverEntity):
@@ -64,7 +79,6 @@ class AdvantageAirZoneVent(AdvantageAirZoneEntity, CoverEntity):
     def __init__(self, instance, ac_key, zone_key):
         """Initialize an Advantage Air Zone Vent."""
         super().__init__(instance, ac_key, zone_key)
-        self._attr_name = self._zone["name"]
 
     @property
     def is_closed(self) -> bool:
@@ -129,10 +143,16 @@ class AdvantageAirZoneVent(AdvantageAirZoneEntity, CoverEntity):
 class AdvantageAirThingCover(AdvantageAirThingEntity, CoverEntity):
     """Representation of Advantage Air Cover controlled by MyPlace."""
 
-    def __init__(self, instance, thing, description):
+    def __init__(self, instance, thing):
         """Initialize an Advantage Air Things Cover."""
         super().__init__(instance, thing)
-        self.entity_description = description
+        self.entity_description = THING_COVERS[thing["channelDipState"]]
+
+    @callback
+    def async_topology_updated(self) -> None:
+        """Follow the thing between blind and garage door."""
+        super().async_topology_updated()
+        self.entity_description = THING_COVERS[self._data["channelDipState"]]
 
     @property
     def is_closed(self) -> bool:
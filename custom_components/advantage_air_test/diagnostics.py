@@ -3,11 +3,14 @@ from __future__ import annotations
 
 from typing import Any
 
+from .advantage_air import percentile
+
 from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
 from .const import DOMAIN as ADVANTAGE_AIR_DOMAIN
+from .scheduler import async_get_scheduler
 
 TO_REDACT = ["dealerPhoneNumber", "latitude", "logoPIN", "longitude", "postCode"]
 
@@ -16,10 +19,55 @@ async def async_get_config_entry_diagnostics(
     hass: HomeAssistant, config_entry: ConfigEntry
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
-    data = hass.data[ADVANTAGE_AIR_DOMAIN][config_entry.entry_id]["coordinator"].data
+    instance = hass.data[ADVANTAGE_AIR_DOMAIN][config_entry.entry_id]
+    data = instance["coordinator"].data
+    api = instance["api"]
 
     # Return only the relevant children
     return {
         "aircons": data["aircons"],
         "system": async_redact_data(data["system"], TO_REDACT),
+        "writes": {
+            endpoint.endpoint: {
+                "merged": endpoint.merged,
+                "requests": endpoint.requests,
+                "bisected": endpoint.bisected,
+                "queued": endpoint.depth,
+                "pending": len(endpoint.overlay),
+                "timeout": endpoint.estimate.timeout,
+            }
+            for endpoint in api.endpoints
+        },
+        "polls": {
+            "requested": api.polls,
+            "hedged": api.hedged,
+            "timeout": api.estimate.timeout,
+            "latency": api.estimate.srtt,
+        },
+        "poll_lag": async_get_scheduler(hass).lag(config_entry.entry_id),
+        "poll_interval": async_get_scheduler(hass).interval(config_entry.entry_id),
+        # Offloaded seconds are event loop time saved on each large poll
+        "processing": {
+            where: {
+                "count": len(samples),
+                "mean": sum(samples) / len(samples) if samples else None,
+                "max": max(samples, default=None),
+            }
+            for where, samples in api.processing.items()
+        },
+        "changes": None if api.changes is None else len(api.changes),
+        "setup": {
+            key: value
+            for key, value in instance["timings"].items()
+            if key != "forwarded"
+        },
+        "convergence": {
+            field: {
+                "count": len(samples),
+                "p50": percentile(samples, 0.5),
+                "p90": percentile(samples, 0.9),
+                "max": max(samples),
+            }
+            for field, samples in api.convergence.items()
+        },
     }
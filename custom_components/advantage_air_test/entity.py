@@ -1,22 +1,306 @@
 """Advantage Air parent entity class."""
+from __future__ import annotations
 
+from collections.abc import Callable, Hashable
+from functools import partial, wraps
+import time
 from typing import Any
 
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.entity import DeviceInfo, Entity
+from homeassistant.helpers.entity_platform import (
+    AddEntitiesCallback,
+    async_get_current_platform,
+)
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 
 
+# Fields of an aircon, zone, light or thing that topology() summarises
+TOPOLOGY_FIELDS = {
+    "name",
+    "freshAirStatus",
+    "climateControlModeEnabled",
+    "myAutoModeEnabled",
+    "number",
+    "type",
+    "motionConfig",
+    "id",
+    "relay",
+    "channelDipState",
+}
+
+
+def touches_topology(path: tuple) -> bool:
+    """Return if a changed path can change the topology of the system.
+
+    Paths that end above the fields of an aircon, zone, light or thing added
+    or removed it.
+    """
+    if path[0] == "aircons":
+        depth = 5 if len(path) > 2 and path[2] == "zones" else 4
+    elif path[0] in ("myLights", "myThings"):
+        depth = 4
+    else:
+        return False
+    return len(path) < depth or path[-1] in TOPOLOGY_FIELDS
+
+
+def changed_subtrees(changes: list[tuple] | None) -> set[tuple] | None:
+    """Return the aircons, lights and things a set of changed paths is in.
+
+    None when the changes are unknown or a whole section changed.
+    """
+    if changes is None:
+        return None
+    subtrees = set()
+    for path in changes:
+        if path[0] == "aircons":
+            depth = 2
+        elif path[0] in ("myLights", "myThings"):
+            depth = 3
+        else:
+            continue
+        if len(path) < depth:
+            return None
+        subtrees.add(path[:depth])
+    return subtrees
+
+
+def topology(data: dict[str, Any]) -> tuple:
+    """Return a summary of every field that decides which entities exist and their names."""
+    aircons = tuple(
+        (
+            ac_key,
+            ac_device["info"]["name"],
+            ac_device["info"]["freshAirStatus"] != "none",
+            "climateControlModeEnabled" in ac_device["info"],
+            "myAutoModeEnabled" in ac_device["info"],
+            tuple(
+                (
+                    zone_key,
+                    zone["name"],
+                    zone["number"],
+                    zone["type"],
+                    zone["motionConfig"],
+                )
+                for zone_key, zone in ac_device["zones"].items()
+            ),
+        )
+        for ac_key, ac_device in data.get("aircons", {}).items()
+    )
+    lights = tuple(
+        (light["id"], light["name"], bool(light.get("relay")))
+        for light in data.get("myLights", {}).get("lights", {}).values()
+    )
+    things = tuple(
+        (thing["id"], thing["name"], thing["channelDipState"])
+        for thing in data.get("myThings", {}).get("things", {}).values()
+    )
+    return (aircons, lights, things)
+
+
+def snapshot_property(source: str, *fields: str) -> Callable[[Callable], property]:
+    """Cache a derived property until one of its input fields changes.
+
+    ``source`` names the property holding the inputs, such as ``_ac``. Reads
+    within one snapshot return the cached value after an identity check, a new
+    snapshot only recomputes when one of ``fields`` has a different value.
+    """
+
+    def decorator(func: Callable) -> property:
+        name = func.__name__
+
+        @wraps(func)
+        def wrapper(self):
+            data = getattr(self, source)
+            cache = self.__dict__.setdefault("_snapshot_cache", {})
+            if (entry := cache.get(name)) is not None and entry[0] is data:
+                return entry[2]
+            key = tuple(data.get(field) for field in fields)
+            if entry is not None and entry[1] == key:
+                value = entry[2]
+            else:
+                value = func(self)
+            cache[name] = (data, key, value)
+            return value
+
+        return property(wrapper)
+
+    return decorator
+
+
+@callback
+def async_setup_dynamic_entities(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    discover: Callable[[dict[str, Any]], dict[Hashable, partial[Entity]]],
+) -> None:
+    """Add the entities of a platform and keep them in sync with the controller.
+
+    ``discover`` maps the coordinator data to a partial of the entity class for
+    every entity that should exist. It only runs when the topology of the
+    system changes, new keys are constructed and added, missing keys are
+    retired and the rest are told to refresh anything derived from names or
+    capabilities. A key whose class changed, such as a light that became
+    dimmable, is replaced by an entity of the new class with the same unique id.
+    """
+    started = time.perf_counter()
+    instance = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = instance["coordinator"]
+    domain = async_get_current_platform().domain
+    entities: dict[Hashable, AdvantageAirEntity] = {}
+    current = None
+
+    async def _async_replace(
+        old: list[AdvantageAirEntity], new: list[AdvantageAirEntity]
+    ) -> None:
+        """Add entities once the ones with their unique ids are gone."""
+        for entity in old:
+            if entity.hass is not None:
+                await entity.async_remove()
+        async_add_entities(new)
+
+    @callback
+    def _async_reconcile() -> None:
+        nonlocal current
+        if instance["topology"] is current:
+            return
+        current = instance["topology"]
+
+        factories = discover(coordinator.data)
+        if retired := [entities.pop(key) for key in entities.keys() - factories.keys()]:
+            async_retire_entities(hass, config_entry, domain, retired)
+        replaced = {
+            key: entities.pop(key)
+            for key, factory in factories.items()
+            if key in entities and type(entities[key]) is not factory.func
+        }
+        for entity in entities.values():
+            entity.async_topology_updated()
+
+        new = {
+            key: factory() for key, factory in factories.items() if key not in entities
+        }
+        entities.update(new)
+        if added := [entity for key, entity in new.items() if key not in replaced]:
+            async_add_entities(added)
+        if replaced:
+            for entity in replaced.values():
+                entity.async_retire()
+            hass.async_create_task(
+                _async_replace(list(replaced.values()), [new[key] for key in replaced])
+            )
+
+    _async_reconcile()
+    config_entry.async_on_unload(coordinator.async_add_listener(_async_reconcile))
+
+    # Time from forwarding to this platform covers importing its module
+    instance["timings"]["platforms"][domain] = {
+        "import": started - instance["timings"]["forwarded"][domain],
+        "setup": time.perf_counter() - started,
+        "entities": len(entities),
+    }
+
+
+@callback
+def async_retire_entities(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    domain: str,
+    entities: list[AdvantageAirEntity],
+) -> None:
+    """Remove entities the controller no longer reports, and devices left without any.
+
+    Entities disabled in the registry were never added, so they are looked up
+    in the registry by unique id rather than through the entity itself.
+    """
+    ent_reg = er.async_get(hass)
+    devices = set()
+    for entity in entities:
+        entity.async_retire()
+        if entity_id := ent_reg.async_get_entity_id(domain, DOMAIN, entity.unique_id):
+            if device_id := ent_reg.async_get(entity_id).device_id:
+                devices.add(device_id)
+            ent_reg.async_remove(entity_id)
+        elif entity.hass is not None:
+            hass.async_create_task(entity.async_remove())
+
+    dev_reg = dr.async_get(hass)
+    for device_id in devices:
+        if not er.async_entries_for_device(
+            ent_reg, device_id, include_disabled_entities=True
+        ):
+            dev_reg.async_update_device(
+                device_id, remove_config_entry_id=config_entry.entry_id
+            )
+
+
 class AdvantageAirEntity(CoordinatorEntity):
     """Parent class for Advantage Air Entities."""
 
     _attr_has_entity_name = True
+    _retired = False
+    # Part of the system data this entity shows, None when it shows more than that
+    _subtree: tuple | None = None
+    # Availability its state was last written with
+    _written_available = False
+    # Oldest data in seconds this entity is useful with, None follows the poll interval
+    _max_staleness: float | None = None
 
     def __init__(self, instance):
         """Initialize common aspects of an Advantage Air entity."""
         super().__init__(instance["coordinator"])
-        self._attr_unique_id = self.coordinator.data["system"]["rid"]
+        self._attr_unique_id = instance["rid"]
+        self._async_require = instance["require"]
+        self._changed_subtrees = partial(instance.get, "changed")
+
+    async def async_added_to_hass(self) -> None:
+        """Ask the scheduler to poll often enough for this entity."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._async_require(self._max_staleness))
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state unless the controller no longer reports this entity or it did not change."""
+        if self._retired:
+            return
+        available = self.coordinator.last_update_success
+        if (
+            self._subtree is not None
+            and available
+            and self._written_available
+            and (changed := self._changed_subtrees()) is not None
+            and self._subtree not in changed
+        ):
+            return
+        self._written_available = available
+        super()._handle_coordinator_update()
+
+    @callback
+    def async_topology_updated(self) -> None:
+        """Refresh anything derived from names or capabilities of the system."""
+        self.__dict__.pop("_snapshot_cache", None)
+
+    @callback
+    def async_retire(self) -> None:
+        """Stop writing state as the controller no longer reports this entity."""
+        self._retired = True
+
+    @callback
+    def _async_update_device_name(self, name: str) -> None:
+        """Rename the device of this entity when the controller renames it."""
+        self._attr_device_info["name"] = name
+        if self.hass is None:
+            return
+        dev_reg = dr.async_get(self.hass)
+        device = dev_reg.async_get_device(self._attr_device_info["identifiers"])
+        if device is not None and device.name != name:
+            dev_reg.async_update_device(device.id, name=name)
 
 
 class AdvantageAirAcEntity(AdvantageAirEntity):
@@ -28,33 +312,54 @@ class AdvantageAirAcEntity(AdvantageAirEntity):
         self.async_change = instance["aircon"]
         self.ac_key = ac_key
         self._attr_unique_id += f"-{ac_key}"
+        self._subtree = ("aircons", ac_key)
 
-        self._attr_device_info = DeviceInfo(
-            via_device=(DOMAIN, self.coordinator.data["system"]["rid"]),
-            identifiers={(DOMAIN, self._attr_unique_id)},
-            manufacturer="Advantage Air",
-            model=self.coordinator.data["system"]["sysType"],
-            name=self.coordinator.data["aircons"][self.ac_key]["info"]["name"],
-        )
+        # Every entity of an aircon shares one device info
+        devices = instance.setdefault("devices", {})
+        if (device := devices.get(self._attr_unique_id)) is None:
+            system = self.coordinator.data["system"]
+            device = devices[self._attr_unique_id] = DeviceInfo(
+                via_device=(DOMAIN, instance["rid"]),
+                identifiers={(DOMAIN, self._attr_unique_id)},
+                manufacturer="Advantage Air",
+                model=system["sysType"],
+                name=self._ac["name"],
+            )
+        self._attr_device_info = device
 
     @property
     def _ac(self):
         return self.coordinator.data["aircons"][self.ac_key]["info"]
 
+    @callback
+    def async_topology_updated(self) -> None:
+        """Follow renames of the aircon."""
+        super().async_topology_updated()
+        self._async_update_device_name(self._ac["name"])
+
 
 class AdvantageAirZoneEntity(AdvantageAirAcEntity):
     """Parent class for Advantage Air Zone Entities."""
 
+    _zone_name_format = "{}"
+
     def __init__(self, instance, ac_key, zone_key):
         """Initialize common aspects of an Advantage Air zone entity."""
         super().__init__(instance, ac_key)
         self.zone_key = zone_key
         self._attr_unique_id += f"-{zone_key}"
+        self._attr_name = self._zone_name_format.format(self._zone["name"])
 
     @property
     def _zone(self):
         return self.coordinator.data["aircons"][self.ac_key]["zones"][self.zone_key]
 
+    @callback
+    def async_topology_updated(self) -> None:
+        """Follow renames of the zone."""
+        super().async_topology_updated()
+        self._attr_name = self._zone_name_format.format(self._zone["name"])
+
 
 class AdvantageAirThingEntity(AdvantageAirEntity):
     """Parent class for Advantage Air Things Entities."""
@@ -65,9 +370,10 @@ class AdvantageAirThingEntity(AdvantageAirEntity):
         self.async_change = instance["things"]
         self._id = thing["id"]
         self._attr_unique_id += f"-{self._id}"
+        self._subtree = ("myThings", "things", self._id)
 
         self._attr_device_info = DeviceInfo(
-            via_device=(DOMAIN, self.coordinator.data["system"]["rid"]),
+            via_device=(DOMAIN, instance["rid"]),
             identifiers={(DOMAIN, self._attr_unique_id)},
             manufacturer="Advantage Air",
             model="MyPlace",
@@ -79,6 +385,12 @@ class AdvantageAirThingEntity(AdvantageAirEntity):
         """Return the thing data."""
         return self.coordinator.data["myThings"]["things"][self._id]
 
+    @callback
+    def async_topology_updated(self) -> None:
+        """Follow renames of the thing."""
+        super().async_topology_updated()
+        self._async_update_device_name(self._data["name"])
+
     @property
     def is_on(self):
         """Return if the thing is considered on."""
@@ -1,4 +1,5 @@
 """Light platform for Advantage Air integration."""
+from functools import partial
 from typing import Any
 
 from homeassistant.components.light import ATTR_BRIGHTNESS, ColorMode, LightEntity
@@ -11,7 +12,7 @@ from .const import (
     ADVANTAGE_AIR_STATE_ON,
     DOMAIN as ADVANTAGE_AIR_DOMAIN,
 )
-from .entity import AdvantageAirThingEntity
+from .entity import AdvantageAirThingEntity, async_setup_dynamic_entities
 
 
 async def async_setup_entry(
@@ -23,31 +24,43 @@ async def async_setup_entry(
 
     instance = hass.data[ADVANTAGE_AIR_DOMAIN][config_entry.entry_id]
 
-    entities: list[LightEntity] = []
-    if "myLights" in instance["coordinator"].data:
-        for light in instance["coordinator"].data["myLights"]["lights"].values():
-            if light.get("relay"):
-                entities.append(AdvantageAirLight(instance, light))
-            else:
-                entities.append(AdvantageAirLightDimmable(instance, light))
-    if "myThings" in instance["coordinator"].data:
-        for thing in instance["coordinator"].data["myThings"]["things"].values():
-            if thing["channelDipState"] == 4:  # 4 = "Light (on/off)""
-                entities.append(AdvantageAirThingLight(instance, thing))
-            elif thing["channelDipState"] == 5:  # 5 = "Light (Dimmable)""
-                entities.append(AdvantageAirThingLightDimmable(instance, thing))
-    async_add_entities(entities)
+    def discover(data):
+        entities = {}
+        if "myLights" in data:
+            for light in data["myLights"]["lights"].values():
+                if light.get("relay"):
+                    entities[("light", light["id"])] = partial(
+                        AdvantageAirLight, instance, light
+                    )
+                else:
+                    entities[("light", light["id"])] = partial(
+                        AdvantageAirLightDimmable, instance, light
+                    )
+        if "myThings" in data:
+            for thing in data["myThings"]["things"].values():
+                if thing["channelDipState"] == 4:  # 4 = "Light (on/off)""
+                    entities[("thing", thing["id"])] = partial(
+                        AdvantageAirThingLight, instance, thing
+                    )
+                elif thing["channelDipState"] == 5:  # 5 = "Light (Dimmable)""
+                    entities[("thing", thing["id"])] = partial(
+                        AdvantageAirThingLightDimmable, instance, thing
+                    )
+        return entities
+
+    async_setup_dynamic_entities(hass, config_entry, async_add_entities, discover)
 
 
 class AdvantageAirLight(AdvantageAirThingEntity, LightEntity):
     """Representation of Advantage Air Light controlled by MyLights."""
 
-    _attr_supported_color_modes = {ColorMode.ONOFF}
+    _attr_supported_color_modes = frozenset({ColorMode.ONOFF})
 
     def __init__(self, instance, light):
         """Initialize an Advantage Air Light."""
         super().__init__(instance, light)
         self.async_change = instance["lights"]
+        self._subtree = ("myLights", "lights", self._id)
 
     @property
     def _data(self):
@@ -75,7 +88,7 @@ class AdvantageAirLight(AdvantageAirThingEntity, LightEntity):
 class AdvantageAirLightDimmable(AdvantageAirLight):
     """Representation of Advantage Air Dimmable Light controlled by MyLights."""
 
-    _attr_supported_color_modes = {ColorMode.ONOFF, ColorMode.BRIGHTNESS}
+    _attr_supported_color_modes = frozenset({ColorMode.ONOFF, ColorMode.BRIGHTNESS})
 
     @property
     def brightness(self) -> int:
@@ -93,13 +106,13 @@ class AdvantageAirLightDimmable(AdvantageAirLight):
 class AdvantageAirThingLight(AdvantageAirThingEntity, LightEntity):
     """Representation of Advantage Air Light controlled by myThings."""
 
-    _attr_supported_color_modes = {ColorMode.ONOFF}
+    _attr_supported_color_modes = frozenset({ColorMode.ONOFF})
 
 
 class AdvantageAirThingLightDimmable(AdvantageAirThingEntity, LightEntity):
     """Representation of Advantage Air Dimmable Light controlled by myThings."""
 
-    _attr_supported_color_modes = {ColorMode.ONOFF, ColorMode.BRIGHTNESS}
+    _attr_supported_color_modes = frozenset({ColorMode.ONOFF, ColorMode.BRIGHTNESS})
 
     @property
     def brightness(self) -> int:
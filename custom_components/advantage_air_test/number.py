@@ -1,4 +1,5 @@
 """Number platform for Advantage Air integration."""
+from functools import partial
 
 from homeassistant.components.number import NumberEntity
 from homeassistant.config_entries import ConfigEntry
@@ -8,7 +9,7 @@ from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN as ADVANTAGE_AIR_DOMAIN
-from .entity import AdvantageAirAcEntity
+from .entity import AdvantageAirAcEntity, async_setup_dynamic_entities
 
 
 async def async_setup_entry(
@@ -20,12 +21,17 @@ async def async_setup_entry(
 
     instance = hass.data[ADVANTAGE_AIR_DOMAIN][config_entry.entry_id]
 
-    entities: list[NumberEntity] = []
-    if "aircons" in instance["coordinator"].data:
-        for ac_key in instance["coordinator"].data["aircons"]:
-            entities.append(AdvantageAirTimeTo(instance, ac_key, "On"))
-            entities.append(AdvantageAirTimeTo(instance, ac_key, "Off"))
-    async_add_entities(entities)
+    def discover(data):
+        entities = {}
+        if "aircons" in data:
+            for ac_key in data["aircons"]:
+                for action in ("On", "Off"):
+                    entities[(action, ac_key)] = partial(
+                        AdvantageAirTimeTo, instance, ac_key, action
+                    )
+        return entities
+
+    async_setup_dynamic_entities(hass, config_entry, async_add_entities, discover)
 
 
 class AdvantageAirTimeTo(AdvantageAirAcEntity, NumberEntity):
@@ -42,9 +48,7 @@ class AdvantageAirTimeTo(AdvantageAirAcEntity, NumberEntity):
         super().__init__(instance, ac_key)
         self._time_key = f"countDownTo{action}"
         self._attr_name = f"Time to {action}"
-        self._attr_unique_id = (
-            f'{self.coordinator.data["system"]["rid"]}-{self.ac_key}-timeto{action}'
-        )
+        self._attr_unique_id = f'{instance["rid"]}-{self.ac_key}-timeto{action}'
 
     @property
     def native_value(self):
@@ -0,0 +1,166 @@
+"""Time boxed profiling of the Advantage Air integration."""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+from collections.abc import Mapping
+import io
+import logging
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_platform
+
+from .const import DOMAIN
+
+DATA_PROFILING = f"{DOMAIN}_profiling"
+
+# Only frames from this package are listed in the focused sections
+PACKAGE = os.path.dirname(__file__)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def deep_size(obj: object) -> int:
+    """Return the size of a decoded JSON document including everything it holds.
+
+    Anything other than mappings, lists and tuples is counted on its own.
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, Mapping):
+        size += sum(deep_size(k) + deep_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(deep_size(v) for v in obj)
+    return size
+
+
+async def async_profile(
+    hass: HomeAssistant, instances: dict[str, dict], duration: float, memory: bool
+) -> str:
+    """Profile the event loop for a while and write a report to the config directory.
+
+    cProfile only sees the event loop thread, which is where polls are
+    diffed and entity states written, decoding on the worker thread shows up
+    as the time spent waiting for it. The report lists the functions of this
+    integration first and the whole loop after, and the raw profile is saved
+    next to it for tools like snakeviz.
+
+    With memory, tracemalloc snapshots are taken on the executor. When tracing
+    was not already running it only sees allocations made during the profile,
+    so the report lists what was allocated then and is still held.
+    """
+    if hass.data.get(DATA_PROFILING):
+        raise HomeAssistantError("A profile is already running")
+    hass.data[DATA_PROFILING] = True
+
+    started_tracing = False
+    before = None
+    if memory:
+        if tracemalloc.is_tracing():
+            before = await hass.async_add_executor_job(tracemalloc.take_snapshot)
+        else:
+            tracemalloc.start(5)
+            started_tracing = True
+
+    profiler = cProfile.Profile()
+    polls = {entry_id: instance["api"].polls for entry_id, instance in instances.items()}
+    start = time.perf_counter()
+    try:
+        try:
+            profiler.enable()
+        except ValueError as err:
+            raise HomeAssistantError(f"Unable to start the profiler: {err}") from err
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+        after = (
+            await hass.async_add_executor_job(tracemalloc.take_snapshot)
+            if memory
+            else None
+        )
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        hass.data.pop(DATA_PROFILING)
+
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = hass.config.path(f"{DOMAIN}_profile_{stamp}.txt")
+    summary = _summary(hass, instances, polls, elapsed)
+    await hass.async_add_executor_job(
+        _write, path, profiler, summary, before, after
+    )
+    _LOGGER.info("Wrote profile of %.0f seconds to %s", elapsed, path)
+    return path
+
+
+def _summary(
+    hass: HomeAssistant,
+    instances: dict[str, dict],
+    polls: dict[str, int],
+    elapsed: float,
+) -> list[str]:
+    """Describe the polls and the memory held by each controller."""
+    lines = [f"Profiled for {elapsed:.1f} seconds", ""]
+    for entry_id, instance in instances.items():
+        lines.append(
+            f"{entry_id}: {instance['api'].polls - polls[entry_id]} polls, "
+            f"coordinator.data holds {deep_size(instance['coordinator'].data)} bytes"
+        )
+    for platform in entity_platform.async_get_platforms(hass, DOMAIN):
+        entities = platform.entities.values()
+        size = sum(
+            deep_size(value) for entity in entities for value in vars(entity).values()
+        )
+        lines.append(
+            f"{platform.domain}: {len(entities)} entities, {size} bytes of attributes"
+        )
+    return lines
+
+
+def _write(
+    path: str,
+    profiler: cProfile.Profile,
+    summary: list[str],
+    before: tracemalloc.Snapshot | None,
+    after: tracemalloc.Snapshot | None,
+) -> None:
+    """Write the report and the raw profile."""
+    profiler.dump_stats(path.replace(".txt", ".prof"))
+    out = io.StringIO()
+    out.write("\n".join(summary) + "\n\n")
+
+    stats = pstats.Stats(profiler, stream=out).sort_stats(pstats.SortKey.CUMULATIVE)
+    out.write("== This integration, by cumulative time ==\n")
+    stats.print_stats(PACKAGE, 40)
+    out.write("== Event loop, by own time ==\n")
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(40)
+
+    if after is not None:
+        package = [tracemalloc.Filter(True, os.path.join(PACKAGE, "*"))]
+        if before is None:
+            # Tracing started with the profile, so every trace is from the window
+            out.write(
+                "== Allocated by this integration during the profile and still held ==\n"
+            )
+            for stat in after.filter_traces(package).statistics("lineno")[:25]:
+                out.write(f"{stat}\n")
+            out.write("\n== Allocated during the profile and still held ==\n")
+            for stat in after.statistics("lineno")[:25]:
+                out.write(f"{stat}\n")
+        else:
+            out.write("== Memory held by this integration ==\n")
+            for stat in after.filter_traces(package).statistics("lineno")[:25]:
+                out.write(f"{stat}\n")
+            out.write("\n== Change in memory held while profiling ==\n")
+            for stat in after.compare_to(before, "lineno")[:25]:
+                out.write(f"{stat}\n")
+
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(out.getvalue())
@@ -0,0 +1,117 @@
+"""Local read proxy for the Advantage Air system data."""
+from __future__ import annotations
+
+from hashlib import blake2b
+from http import HTTPStatus
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import CONF_PROXY, CONF_PROXY_WRITE, DOMAIN
+
+DATA_PROXY = f"{DOMAIN}_proxy"
+
+# Subtrees of getSystemData that can be requested on their own
+SUBTREES = ("aircons", "myLights", "myThings", "system")
+
+# Write endpoints of the tablet and the instance key of their batching queue
+WRITES = {"setAircon": "aircon", "setLights": "lights", "setThings": "things"}
+
+
+@callback
+def async_setup_proxy(hass: HomeAssistant) -> None:
+    """Register the proxy view once, entries opt in through their options."""
+    if DATA_PROXY not in hass.data:
+        hass.data[DATA_PROXY] = True
+        hass.http.register_view(AdvantageAirProxyView())
+
+
+class AdvantageAirProxyView(HomeAssistantView):
+    """Serve the latest snapshot of a controller in the format of the tablet.
+
+    Reads never reach the controller, so any number of consumers can poll
+    this instead of the tablet. The body of each snapshot is encoded once and
+    tagged with a hash of its content, so a consumer that sends it back with
+    If-None-Match gets an empty 304 until something changes. The Age header
+    is the number of seconds since the snapshot was fetched, and
+    X-Advantage-Air-Stale is set while the controller is unreachable.
+    """
+
+    url = f"/api/{DOMAIN}/{{entry_id}}/{{endpoint}}"
+    extra_urls = [f"/api/{DOMAIN}/{{entry_id}}/getSystemData/{{subtree}}"]
+    name = f"api:{DOMAIN}:proxy"
+
+    async def get(
+        self,
+        request: web.Request,
+        entry_id: str,
+        endpoint: str = "getSystemData",
+        subtree: str | None = None,
+    ) -> web.Response:
+        """Return a snapshot, or pass a write on to the batching queue."""
+        hass: HomeAssistant = request.app["hass"]
+        entry = hass.config_entries.async_get_entry(entry_id)
+        instance = hass.data.get(DOMAIN, {}).get(entry_id)
+        if (
+            entry is None
+            or instance is None
+            or not entry.options.get(CONF_PROXY, False)
+        ):
+            return self.json_message("Not found", HTTPStatus.NOT_FOUND)
+
+        if endpoint in WRITES:
+            if not entry.options.get(CONF_PROXY_WRITE, False):
+                return self.json_message("Writes are disabled", HTTPStatus.FORBIDDEN)
+            return await self._async_write(request, instance, endpoint)
+        if endpoint != "getSystemData" or (subtree and subtree not in SUBTREES):
+            return self.json_message("Not found", HTTPStatus.NOT_FOUND)
+
+        coordinator = instance["coordinator"]
+        etag, body = _encode(instance, coordinator.data, subtree)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+            "Age": str(max(0, int(hass.loop.time() - instance["fetched"]))),
+        }
+        if not coordinator.last_update_success:
+            headers["X-Advantage-Air-Stale"] = "1"
+        if etag in request.headers.get("If-None-Match", ""):
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+        return web.Response(
+            body=body, content_type="application/json", headers=headers
+        )
+
+    async def _async_write(
+        self, request: web.Request, instance: dict, endpoint: str
+    ) -> web.Response:
+        """Queue a change sent as ?json= like the tablet expects."""
+        try:
+            change = instance["api"].codec.loads(request.query["json"])
+        except (KeyError, ValueError):
+            return self.json_message("Missing or invalid json", HTTPStatus.BAD_REQUEST)
+        if not isinstance(change, dict):
+            return self.json_message("Missing or invalid json", HTTPStatus.BAD_REQUEST)
+        try:
+            await instance[WRITES[endpoint]](change)
+        except HomeAssistantError as err:
+            return self.json(
+                {"ack": False, "reason": str(err), "request": endpoint},
+                HTTPStatus.BAD_GATEWAY,
+            )
+        return self.json({"ack": True, "request": endpoint})
+
+
+def _encode(instance: dict, data: dict, subtree: str | None) -> tuple[str, bytes]:
+    """Return the tag and body of a snapshot, encoding it once per poll."""
+    cache = instance.setdefault("proxy", {})
+    if (cached := cache.get(subtree)) is not None and cached[0] is data:
+        return cached[1], cached[2]
+    body = instance["api"].codec.dumps(
+        data.get(subtree, {}) if subtree else data
+    ).encode()
+    etag = f'"{blake2b(body, digest_size=8).hexdigest()}"'
+    cache[subtree] = (data, etag, body)
+    return etag, body
@@ -0,0 +1,144 @@
+"""Record and replay the traffic between Advantage Air and its controller."""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import time
+from typing import Any
+
+from .advantage_air import ApiError, advantage_air, load_recording, replay_session
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .diagnostics import TO_REDACT
+from .entity import topology
+
+_LOGGER = logging.getLogger(__name__)
+
+# Exchanges held on the loop before they are written
+RECORD_BATCH = 20
+
+
+class AdvantageAirRecorder:
+    """Collect controller exchanges and append them to a compact file in batches.
+
+    Exchanges are kept as the raw bodies until a batch is full, then decoded,
+    redacted and written in the executor, one batch after the other.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: str) -> None:
+        """Initialize the recorder."""
+        self.hass = hass
+        self.path = path
+        self.count = 0
+        self._batch: list[tuple[float, str, Any, bytes]] = []
+        self._writing: asyncio.Task | None = None
+
+    @callback
+    def __call__(self, path: str, request: Any, response: bytes) -> None:
+        """Record a single exchange with the controller."""
+        self._batch.append((time.time(), path, request, response))
+        if len(self._batch) >= RECORD_BATCH:
+            self._async_flush()
+
+    @callback
+    def _async_flush(self) -> None:
+        """Write the exchanges collected so far after the batches before them."""
+        batch, self._batch = self._batch, []
+        self._writing = self.hass.async_create_task(
+            self._async_write(self._writing, batch)
+        )
+
+    async def _async_write(
+        self, previous: asyncio.Task | None, batch: list[tuple[float, str, Any, bytes]]
+    ) -> None:
+        """Append a batch once the previous one is written."""
+        if previous is not None:
+            await previous
+        self.count += await self.hass.async_add_executor_job(self._write, batch)
+
+    def _write(self, batch: list[tuple[float, str, Any, bytes]]) -> int:
+        """Encode and append a batch, returning how many exchanges it had."""
+        with gzip.open(self.path, "at") as file:
+            for t, path, request, response in batch:
+                file.write(
+                    json.dumps(
+                        {
+                            "t": t,
+                            "path": path,
+                            "request": request,
+                            "response": async_redact_data(
+                                json.loads(response), TO_REDACT
+                            ),
+                        },
+                        separators=(",", ":"),
+                    )
+                    + "\n"
+                )
+        return len(batch)
+
+    async def async_close(self) -> int:
+        """Write what is left, returning how many exchanges were recorded."""
+        self._async_flush()
+        await self._writing
+        return self.count
+
+
+async def async_replay(
+    hass: HomeAssistant, instance: dict[str, Any], path: str, realtime: bool
+) -> list[float]:
+    """Feed a recording through a client and coordinator, returning CPU time per poll.
+
+    CPU time is that of the event loop thread, plus the processing the client
+    offloaded to the executor. The replay gets a client and coordinator of its
+    own with the tuning of the loaded entry, so its entities, writes, polling
+    and runtime totals are left alone.
+    """
+    records = await hass.async_add_executor_job(load_recording, path)
+    live = instance["api"]
+    replay = replay_session(records, realtime)
+    api = advantage_air(
+        live.ip,
+        port=live.port,
+        session=replay,
+        executor=live.executor,
+        codec=live.codec,
+        projection=live.projection,
+        offload_threshold=live.offload_threshold,
+    )
+
+    async def async_get():
+        try:
+            data = await api.async_get(1)
+        except ApiError as err:
+            raise UpdateFailed(err) from err
+        topology(data)
+        return data
+
+    coordinator = DataUpdateCoordinator(
+        hass,
+        _LOGGER,
+        name="Advantage Air replay",
+        update_method=async_get,
+    )
+    cpu = []
+    offloaded = api.processing["offloaded"]
+    while replay.polls:
+        offloaded.clear()
+        start = time.thread_time()
+        await coordinator.async_refresh()
+        cpu.append(time.thread_time() - start + sum(offloaded))
+
+    if cpu:
+        _LOGGER.info(
+            "Replayed %s polls from %s using %.2f ms CPU per poll on average and %.2f ms at most",
+            len(cpu),
+            path,
+            sum(cpu) / len(cpu) * 1000,
+            max(cpu) * 1000,
+        )
+    return cpu
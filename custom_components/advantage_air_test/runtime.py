@@ -0,0 +1,134 @@
+"""Runtime accumulators for Advantage Air."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    ADVANTAGE_AIR_RUNTIME_GAP_POLLS,
+    ADVANTAGE_AIR_RUNTIME_MAX_GAP,
+    ADVANTAGE_AIR_RUNTIME_SAVE_DELAY,
+    ADVANTAGE_AIR_STATE_ON,
+    ADVANTAGE_AIR_STATE_OPEN,
+    DOMAIN,
+)
+
+STORAGE_VERSION = 1
+
+# Modes where the compressor is not running even though the aircon is on
+NON_COMPRESSOR_MODES = {"vent"}
+
+
+class AdvantageAirRuntime:
+    """Accumulate run time and damper duty cycle from each snapshot.
+
+    Every interval between two polls is credited to the state seen at the
+    start of it, so a poll costs one pass over the zones and no history
+    queries. Intervals longer than a few polls at the interval in effect when
+    they started, such as while the controller was unreachable or Home
+    Assistant was stopped, are not counted.
+    The totals are written to storage shortly after they change.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        interval: Callable[[], float | None] | None = None,
+    ) -> None:
+        """Initialize the accumulators."""
+        self.hass = hass
+        self._interval = interval
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.runtime"
+        )
+        self.aircons: dict[str, dict[str, Any]] = {}
+        self._last: float | None = None
+        self._max_gap: float = ADVANTAGE_AIR_RUNTIME_MAX_GAP
+        self._state: dict[str, tuple] = {}
+
+    async def async_load(self) -> None:
+        """Restore the totals saved before the last restart."""
+        if stored := await self._store.async_load():
+            self.aircons = stored["aircons"]
+
+    async def async_save(self) -> None:
+        """Write the totals to storage now."""
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Remove the stored totals."""
+        await self._store.async_remove()
+
+    @callback
+    def async_update(self, data: dict[str, Any]) -> None:
+        """Credit the time since the previous snapshot and remember this one."""
+        now = self.hass.loop.time()
+        # Polls may have slowed down or sped up since the previous one
+        max_gap = self._gap()
+        if self._last is not None and 0 < (elapsed := now - self._last) <= max(
+            self._max_gap, max_gap
+        ):
+            self._accumulate(elapsed)
+            self._store.async_delay_save(
+                self._data_to_save, ADVANTAGE_AIR_RUNTIME_SAVE_DELAY
+            )
+        self._last = now
+        self._max_gap = max_gap
+
+        self._state = {
+            ac_key: (
+                ac_device["info"]["state"] == ADVANTAGE_AIR_STATE_ON,
+                ac_device["info"]["mode"],
+                {
+                    zone_key: (zone["state"] == ADVANTAGE_AIR_STATE_OPEN, zone["value"])
+                    for zone_key, zone in ac_device["zones"].items()
+                },
+            )
+            for ac_key, ac_device in data.get("aircons", {}).items()
+        }
+
+    def _gap(self) -> float:
+        """Return the longest interval between polls that still counts."""
+        interval = self._interval() if self._interval else None
+        return max(
+            ADVANTAGE_AIR_RUNTIME_MAX_GAP,
+            ADVANTAGE_AIR_RUNTIME_GAP_POLLS * (interval or 0),
+        )
+
+    def _accumulate(self, elapsed: float) -> None:
+        """Add an interval to every total according to the previous snapshot."""
+        for ac_key, (on, mode, zones) in self._state.items():
+            totals = self.aircons.setdefault(
+                ac_key, {"on": 0.0, "compressor": 0.0, "modes": {}, "zones": {}}
+            )
+            if on:
+                totals["on"] += elapsed
+                totals["modes"][mode] = totals["modes"].get(mode, 0.0) + elapsed
+                if mode not in NON_COMPRESSOR_MODES:
+                    totals["compressor"] += elapsed
+            for zone_key, (open_, value) in zones.items():
+                zone = totals["zones"].setdefault(
+                    zone_key, {"open": 0.0, "position": 0.0}
+                )
+                if open_:
+                    zone["open"] += elapsed
+                    zone["position"] += value * elapsed
+
+    def aircon(self, ac_key: str) -> dict[str, Any]:
+        """Return the totals of an aircon, in seconds."""
+        return self.aircons.get(
+            ac_key, {"on": 0.0, "compressor": 0.0, "modes": {}, "zones": {}}
+        )
+
+    def zone(self, ac_key: str, zone_key: str) -> dict[str, float]:
+        """Return the totals of a zone, with position integrated over seconds open."""
+        return self.aircon(ac_key)["zones"].get(zone_key, {"open": 0.0, "position": 0.0})
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to store."""
+        return {"aircons": self.aircons}
@@ -0,0 +1,213 @@
+"""Shared polling scheduler for every Advantage Air controller."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+import math
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import ADVANTAGE_AIR_MAX_CONCURRENT_POLLS, DOMAIN
+
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+
+
+@dataclass(eq=False)
+class _Poller:
+    """Polling state of a single controller."""
+
+    coordinator: DataUpdateCoordinator
+    base: float
+    interval: float = 0
+    requirements: Counter[float | None] = field(default_factory=Counter)
+    offset: float = 0
+    due: float | None = None
+    lag: float | None = None
+    timer: asyncio.TimerHandle | None = None
+
+    def demand(self) -> float:
+        """Return the interval the strictest consumer needs.
+
+        Consumers without a requirement of their own follow the configured
+        interval, which is also used while there are no consumers at all.
+        """
+        if not self.requirements:
+            return self.base
+        return min(
+            self.base if staleness is None else staleness
+            for staleness in self.requirements
+        )
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> AdvantageAirPollScheduler:
+    """Return the scheduler shared by all config entries.
+
+    It lives until Home Assistant stops, so entries set up or unloaded in the
+    meantime never find its executor shut down.
+    """
+    if DATA_SCHEDULER not in hass.data:
+        scheduler = hass.data[DATA_SCHEDULER] = AdvantageAirPollScheduler(hass)
+
+        @callback
+        def _async_stop(event: Event) -> None:
+            scheduler.async_shutdown()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_stop)
+    return hass.data[DATA_SCHEDULER]
+
+
+class AdvantageAirPollScheduler:
+    """Spread the polls of every controller evenly over their interval.
+
+    Each controller gets a fixed slot on a grid anchored when the scheduler
+    was created, so polls never drift into phase, and at most a few
+    getSystemData requests are in flight at once. Responses are decoded on a
+    single worker thread shared by every client.
+
+    The interval of a controller follows the strictest maximum staleness its
+    consumers currently require, so it speeds up while motion sensors are in
+    use and slows down again when only slow changing data is wanted.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_concurrent: int = ADVANTAGE_AIR_MAX_CONCURRENT_POLLS,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="advantage_air_decode"
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._anchor = hass.loop.time()
+        self._pollers: dict[str, _Poller] = {}
+
+    @callback
+    def async_register(
+        self, key: str, coordinator: DataUpdateCoordinator, interval: float
+    ) -> CALLBACK_TYPE:
+        """Start polling a controller, returning a callback that stops it."""
+        self._pollers[key] = poller = _Poller(coordinator, interval)
+        poller.interval = poller.demand()
+        self._async_rebalance()
+
+        @callback
+        def _async_unregister() -> None:
+            # Already gone when Home Assistant stopped first
+            if (poller := self._pollers.pop(key, None)) is None:
+                return
+            if poller.timer:
+                poller.timer.cancel()
+            if self._pollers:
+                self._async_rebalance()
+
+        return _async_unregister
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop polling and let the worker thread exit once it is idle."""
+        for poller in self._pollers.values():
+            if poller.timer:
+                poller.timer.cancel()
+                poller.timer = None
+        self._pollers.clear()
+        self.executor.shutdown(wait=False)
+
+    @callback
+    def async_set_interval(self, key: str, interval: float) -> None:
+        """Change how often a controller is polled by consumers without a requirement."""
+        self._pollers[key].base = interval
+        self._async_update_demand(self._pollers[key])
+
+    @callback
+    def async_require(self, key: str, staleness: float | None) -> CALLBACK_TYPE:
+        """Require data of a controller at most this many seconds old.
+
+        None follows the configured interval. Returns a callback that drops
+        the requirement again.
+        """
+        poller = self._pollers[key]
+        poller.requirements[staleness] += 1
+        self._async_update_demand(poller)
+
+        @callback
+        def _async_release() -> None:
+            poller.requirements[staleness] -= 1
+            if not poller.requirements[staleness]:
+                del poller.requirements[staleness]
+            if poller in self._pollers.values():
+                self._async_update_demand(poller)
+
+        return _async_release
+
+    def interval(self, key: str) -> float | None:
+        """Return how often a controller is currently polled."""
+        if poller := self._pollers.get(key):
+            return poller.interval
+        return None
+
+    @callback
+    def _async_update_demand(self, poller: _Poller) -> None:
+        """Reschedule every controller when one needs a different interval."""
+        if (interval := poller.demand()) != poller.interval:
+            poller.interval = interval
+            self._async_rebalance()
+
+    @asynccontextmanager
+    async def async_limit(self, key: str) -> AsyncIterator[None]:
+        """Hold a request slot, recording how late a scheduled poll started."""
+        async with self._semaphore:
+            if (poller := self._pollers.get(key)) and poller.due is not None:
+                poller.lag = self.hass.loop.time() - poller.due
+                poller.due = None
+            yield
+
+    def lag(self, key: str) -> float | None:
+        """Return how late the last scheduled poll of a controller started."""
+        if poller := self._pollers.get(key):
+            return poller.lag
+        return None
+
+    @callback
+    def _async_rebalance(self) -> None:
+        """Give every controller an evenly spaced slot and reschedule them."""
+        count = len(self._pollers)
+        for index, poller in enumerate(self._pollers.values()):
+            poller.offset = poller.interval * index / count
+            self._async_schedule(poller)
+
+    @callback
+    def _async_schedule(self, poller: _Poller) -> None:
+        """Schedule the next slot of a controller that is in the future."""
+        if poller.timer:
+            poller.timer.cancel()
+        now = self.hass.loop.time()
+        start = self._anchor + poller.offset
+        due = start + math.ceil((now - start) / poller.interval) * poller.interval
+        if due <= now:
+            due += poller.interval
+        poller.timer = self.hass.loop.call_at(due, self._async_fire, poller, due)
+
+    @callback
+    def _async_fire(self, poller: _Poller, due: float) -> None:
+        """Poll a controller whose slot has come up."""
+        poller.timer = None
+        poller.due = due
+        self.hass.async_create_task(self._async_poll(poller))
+
+    async def _async_poll(self, poller: _Poller) -> None:
+        """Refresh a controller and schedule its next slot."""
+        try:
+            await poller.coordinator.async_refresh()
+        finally:
+            # Skip the slot if it was unregistered or rescheduled while polling
+            if poller.timer is None and poller in self._pollers.values():
+                self._async_schedule(poller)
@@ -1,11 +1,13 @@
 """Select platform for Advantage Air integration."""
+from functools import partial
+
 from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN as ADVANTAGE_AIR_DOMAIN
-from .entity import AdvantageAirAcEntity
+from .entity import AdvantageAirAcEntity, async_setup_dynamic_entities
 
 ADVANTAGE_AIR_INACTIVE = "Inactive"
 
@@ -19,11 +21,16 @@ async def async_setup_entry(
 
     instance = hass.data[ADVANTAGE_AIR_DOMAIN][config_entry.entry_id]
 
-    entities: list[SelectEntity] = []
-    if "aircons" in instance["coordinator"].data:
-        for ac_key in instance["coordinator"].data["aircons"]:
-            entities.append(AdvantageAirMyZone(instance, ac_key))
-    async_add_entities(entities)
+    def discover(data):
+        entities = {}
+        if "aircons" in data:
+            for ac_key in data["aircons"]:
+                entities[("myzone", ac_key)] = partial(
+                    AdvantageAirMyZone, instance, ac_key
+                )
+        return entities
+
+    async_setup_dynamic_entities(hass, config_entry, async_add_entities, discover)
 
 
 class AdvantageAirMyZone(AdvantageAirAcEntity, SelectEntity):
@@ -36,11 +43,21 @@ class AdvantageAirMyZone(AdvantageAirAcEntity, SelectEntity):
         """Initialize an Advantage Air MyZone control."""
         super().__init__(instance, ac_key)
         self._attr_unique_id += "-myzone"
+        self._update_options()
+
+    @callback
+    def async_topology_updated(self) -> None:
+        """Follow zones being added, removed or renamed."""
+        super().async_topology_updated()
+        self._update_options()
+
+    def _update_options(self) -> None:
+        """Map the zones that can be the MyZone to their names."""
         self._attr_options = [ADVANTAGE_AIR_INACTIVE]
         self._number_to_name = {0: ADVANTAGE_AIR_INACTIVE}
         self._name_to_number = {ADVANTAGE_AIR_INACTIVE: 0}
 
-        for zone in instance["coordinator"].data["aircons"][ac_key]["zones"].values():
+        for zone in self.coordinator.data["aircons"][self.ac_key]["zones"].values():
             if zone["type"] > 0:
                 self._name_to_number[zone["name"]] = zone["number"]
                 self._number_to_name[zone["number"]] = zone["name"]
@@ -1,19 +1,26 @@
 """Sensor platform for Advantage Air integration."""
 from __future__ import annotations
 
+from functools import partial
+
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import PERCENTAGE, TEMP_CELSIUS
+from homeassistant.const import PERCENTAGE, TEMP_CELSIUS, TIME_HOURS
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import ADVANTAGE_AIR_STATE_OPEN, DOMAIN as ADVANTAGE_AIR_DOMAIN
-from .entity import AdvantageAirZoneEntity
+from .entity import (
+    AdvantageAirAcEntity,
+    AdvantageAirZoneEntity,
+    async_setup_dynamic_entities,
+    snapshot_property,
+)
 
 PARALLEL_UPDATES = 0
 
@@ -26,19 +33,44 @@ async def async_setup_entry(
     """Set up AdvantageAir sensor platform."""
 
     instance = hass.data[ADVANTAGE_AIR_DOMAIN][config_entry.entry_id]
-
-    entities: list[SensorEntity] = []
-    if "aircons" in instance["coordinator"].data:
-        for ac_key, ac_device in instance["coordinator"].data["aircons"].items():
-            for zone_key, zone in ac_device["zones"].items():
-                # Only show damper and temp sensors when zone is in temperature control
-                if zone["type"] != 0:
-                    entities.append(AdvantageAirZoneVent(instance, ac_key, zone_key))
-                    entities.append(AdvantageAirZoneTemp(instance, ac_key, zone_key))
-                # Only show wireless signal strength sensors when using wireless sensors
-                if zone["rssi"] > 0:
-                    entities.append(AdvantageAirZoneSignal(instance, ac_key, zone_key))
-    async_add_entities(entities)
+    # Zones that reported a wireless sensor keep their signal sensor when it drops out
+    wireless = set()
+
+    def discover(data):
+        entities = {}
+        if "aircons" in data:
+            for ac_key, ac_device in data["aircons"].items():
+                entities[("runtime", ac_key)] = partial(
+                    AdvantageAirRunTime, instance, ac_key
+                )
+                entities[("compressor", ac_key)] = partial(
+                    AdvantageAirCompressorTime, instance, ac_key
+                )
+                for zone_key, zone in ac_device["zones"].items():
+                    entities[("open", ac_key, zone_key)] = partial(
+                        AdvantageAirZoneOpenTime, instance, ac_key, zone_key
+                    )
+                    entities[("position", ac_key, zone_key)] = partial(
+                        AdvantageAirZoneAveragePosition, instance, ac_key, zone_key
+                    )
+                    # Only show damper and temp sensors when zone is in temperature control
+                    if zone["type"] != 0:
+                        entities[("vent", ac_key, zone_key)] = partial(
+                            AdvantageAirZoneVent, instance, ac_key, zone_key
+                        )
+                        entities[("temp", ac_key, zone_key)] = partial(
+                            AdvantageAirZoneTemp, instance, ac_key, zone_key
+                        )
+                    # Only show wireless signal strength sensors when using wireless sensors
+                    if zone["rssi"] > 0:
+                        wireless.add((ac_key, zone_key))
+                    if (ac_key, zone_key) in wireless:
+                        entities[("signal", ac_key, zone_key)] = partial(
+                            AdvantageAirZoneSignal, instance, ac_key, zone_key
+                        )
+        return entities
+
+    async_setup_dynamic_entities(hass, config_entry, async_add_entities, discover)
 
 
 class AdvantageAirZoneVent(AdvantageAirZoneEntity, SensorEntity):
@@ -47,11 +79,11 @@ class AdvantageAirZoneVent(AdvantageAirZoneEntity, SensorEntity):
     _attr_native_unit_of_measurement = PERCENTAGE
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _zone_name_format = "{} vent"
 
     def __init__(self, instance, ac_key, zone_key):
         """Initialize an Advantage Air Zone Vent Sensor."""
         super().__init__(instance, ac_key, zone_key=zone_key)
-        self._attr_name = f'{self._zone["name"]} vent'
         self._attr_unique_id += "-vent"
 
     @property
@@ -75,11 +107,11 @@ class AdvantageAirZoneSignal(AdvantageAirZoneEntity, SensorEntity):
     _attr_native_unit_of_measurement = PERCENTAGE
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _zone_name_format = "{} signal"
 
     def __init__(self, instance, ac_key, zone_key):
         """Initialize an Advantage Air Zone wireless signal sensor."""
         super().__init__(instance, ac_key, zone_key)
-        self._attr_name = f'{self._zone["name"]} signal'
         self._attr_unique_id += "-signal"
 
     @property
@@ -87,7 +119,7 @@ class AdvantageAirZoneSignal(AdvantageAirZoneEntity, SensorEntity):
         """Return the current value of the wireless signal."""
         return self._zone["rssi"]
 
-    @property
+    @snapshot_property("_zone", "rssi")
     def icon(self):
         """Return a representative icon."""
         if self._zone["rssi"] >= 80:
@@ -109,14 +141,107 @@ class AdvantageAirZoneTemp(AdvantageAirZoneEntity, SensorEntity):
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_entity_registry_enabled_default = False
     _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _zone_name_format = "{} temperature"
 
     def __init__(self, instance, ac_key, zone_key):
         """Initialize an Advantage Air Zone Temp Sensor."""
         super().__init__(instance, ac_key, zone_key)
-        self._attr_name = f'{self._zone["name"]} temperature'
         self._attr_unique_id += "-temp"
 
     @property
     def native_value(self):
         """Return the current value of the measured temperature."""
         return self._zone["measuredTemp"]
+
+
+class AdvantageAirRunTime(AdvantageAirAcEntity, SensorEntity):
+    """Representation of the total time an Advantage Air aircon has been on."""
+
+    _attr_native_unit_of_measurement = TIME_HOURS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:timer-outline"
+    _attr_name = "Run time"
+    _total = "on"
+
+    def __init__(self, instance, ac_key):
+        """Initialize an Advantage Air run time sensor."""
+        super().__init__(instance, ac_key)
+        self._runtime = instance["runtime"]
+        # Totals grow with time while the data stays the same
+        self._subtree = None
+        self._attr_unique_id += f"-{self._total}-time"
+
+    @property
+    def native_value(self):
+        """Return the accumulated time in hours."""
+        return round(self._runtime.aircon(self.ac_key)[self._total] / 3600, 3)
+
+
+class AdvantageAirCompressorTime(AdvantageAirRunTime):
+    """Representation of the total time an Advantage Air compressor has run."""
+
+    _attr_icon = "mdi:heat-pump-outline"
+    _attr_name = "Compressor time"
+    _total = "compressor"
+
+    @property
+    def extra_state_attributes(self):
+        """Return the accumulated time of each mode in hours."""
+        return {
+            mode: round(seconds / 3600, 3)
+            for mode, seconds in self._runtime.aircon(self.ac_key)["modes"].items()
+        }
+
+
+class AdvantageAirZoneOpenTime(AdvantageAirZoneEntity, SensorEntity):
+    """Representation of the total time an Advantage Air zone has been open."""
+
+    _attr_native_unit_of_measurement = TIME_HOURS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_entity_registry_enabled_default = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:timer-outline"
+    _zone_name_format = "{} open time"
+
+    def __init__(self, instance, ac_key, zone_key):
+        """Initialize an Advantage Air zone open time sensor."""
+        super().__init__(instance, ac_key, zone_key)
+        self._runtime = instance["runtime"]
+        # Totals grow with time while the data stays the same
+        self._subtree = None
+        self._attr_unique_id += "-open-time"
+
+    @property
+    def native_value(self):
+        """Return the accumulated time in hours."""
+        return round(self._runtime.zone(self.ac_key, self.zone_key)["open"] / 3600, 3)
+
+
+class AdvantageAirZoneAveragePosition(AdvantageAirZoneEntity, SensorEntity):
+    """Representation of the time weighted position of an Advantage Air zone."""
+
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_registry_enabled_default = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:fan-chevron-up"
+    _zone_name_format = "{} average vent"
+
+    def __init__(self, instance, ac_key, zone_key):
+        """Initialize an Advantage Air zone average position sensor."""
+        super().__init__(instance, ac_key, zone_key)
+        self._runtime = instance["runtime"]
+        # The average moves with time while the data stays the same
+        self._subtree = None
+        self._attr_unique_id += "-average-vent"
+
+    @property
+    def native_value(self):
+        """Return the average position while the zone was open."""
+        zone = self._runtime.zone(self.ac_key, self.zone_key)
+        if not zone["open"]:
+            return None
+        return round(zone["position"] / zone["open"], 1)
@@ -0,0 +1,118 @@
+"""Services for the Advantage Air integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+
+from .const import DOMAIN
+
+SERVICE_PROFILE = "profile"
+SERVICE_RECORD = "record"
+SERVICE_REPLAY = "replay"
+
+ATTR_DURATION = "duration"
+ATTR_ENTRY_ID = "entry_id"
+ATTR_FILE = "file"
+ATTR_MEMORY = "memory"
+ATTR_REALTIME = "realtime"
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_DURATION, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=300)
+        ),
+        vol.Optional(ATTR_MEMORY, default=False): cv.boolean,
+    }
+)
+RECORD_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_DURATION, default=300): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=86400)
+        ),
+    }
+)
+REPLAY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTRY_ID): cv.string,
+        vol.Required(ATTR_FILE): cv.string,
+        vol.Optional(ATTR_REALTIME, default=False): cv.boolean,
+    }
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _instances(hass: HomeAssistant, entry_id: str | None) -> dict[str, dict]:
+    """Return the loaded config entries a service call applies to."""
+    instances = hass.data.get(DOMAIN, {})
+    if entry_id is None:
+        return dict(instances)
+    if entry_id not in instances:
+        raise HomeAssistantError(f"Config entry {entry_id} is not loaded")
+    return {entry_id: instances[entry_id]}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Advantage Air services."""
+
+    async def async_record(call: ServiceCall) -> None:
+        """Record controller traffic to the config directory for a while."""
+        from .replay import AdvantageAirRecorder
+
+        instances = _instances(hass, call.data.get(ATTR_ENTRY_ID))
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        recorders = {}
+        for entry_id, instance in instances.items():
+            recorders[entry_id] = instance["api"].recorder = AdvantageAirRecorder(
+                hass, hass.config.path(f"{DOMAIN}_{entry_id}_{stamp}.jsonl.gz")
+            )
+        try:
+            await asyncio.sleep(call.data[ATTR_DURATION])
+        finally:
+            for entry_id, recorder in recorders.items():
+                if instances[entry_id]["api"].recorder is recorder:
+                    instances[entry_id]["api"].recorder = None
+                count = await recorder.async_close()
+                _LOGGER.info("Recorded %s exchanges to %s", count, recorder.path)
+
+    async def async_replay(call: ServiceCall) -> None:
+        """Replay a recording through the client and coordinator."""
+        from .replay import async_replay as _async_replay
+
+        instance = _instances(hass, call.data[ATTR_ENTRY_ID])[call.data[ATTR_ENTRY_ID]]
+        await _async_replay(
+            hass,
+            instance,
+            hass.config.path(call.data[ATTR_FILE]),
+            call.data[ATTR_REALTIME],
+        )
+
+    async def async_profile(call: ServiceCall) -> None:
+        """Profile the integration for a while and write a report."""
+        from .profiler import async_profile as _async_profile
+
+        await _async_profile(
+            hass,
+            _instances(hass, call.data.get(ATTR_ENTRY_ID)),
+            call.data[ATTR_DURATION],
+            call.data[ATTR_MEMORY],
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_RECORD, async_record, schema=RECORD_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_REPLAY, async_replay, schema=REPLAY_SCHEMA
+    )
@@ -1,4 +1,6 @@
 """Switch platform for Advantage Air integration."""
+from functools import partial
+
 from homeassistant.components.switch import SwitchDeviceClass, SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
@@ -9,7 +11,11 @@ from .const import (
     ADVANTAGE_AIR_STATE_ON,
     DOMAIN as ADVANTAGE_AIR_DOMAIN,
 )
-from .entity import AdvantageAirAcEntity, AdvantageAirThingEntity
+from .entity import (
+    AdvantageAirAcEntity,
+    AdvantageAirThingEntity,
+    async_setup_dynamic_entities,
+)
 
 
 async def async_setup_entry(
@@ -21,16 +27,23 @@ async def async_setup_entry(
 
     instance = hass.data[ADVANTAGE_AIR_DOMAIN][config_entry.entry_id]
 
-    entities: list[SwitchEntity] = []
-    if "aircons" in instance["coordinator"].data:
-        for ac_key, ac_device in instance["coordinator"].data["aircons"].items():
-            if ac_device["info"]["freshAirStatus"] != "none":
-                entities.append(AdvantageAirFreshAir(instance, ac_key))
-    if "myThings" in instance["coordinator"].data:
-        for thing in instance["coordinator"].data["myThings"]["things"].values():
-            if thing["channelDipState"] == 8:  # 8 = Other relay
-                entities.append(AdvantageAirRelay(instance, thing))
-    async_add_entities(entities)
+    def discover(data):
+        entities = {}
+        if "aircons" in data:
+            for ac_key, ac_device in data["aircons"].items():
+                if ac_device["info"]["freshAirStatus"] != "none":
+                    entities[("freshair", ac_key)] = partial(
+                        AdvantageAirFreshAir, instance, ac_key
+                    )
+        if "myThings" in data:
+            for thing in data["myThings"]["things"].values():
+                if thing["channelDipState"] == 8:  # 8 = Other relay
+                    entities[("relay", thing["id"])] = partial(
+                        AdvantageAirRelay, instance, thing
+                    )
+        return entities
+
+    async_setup_dynamic_entities(hass, config_entry, async_add_entities, discover)
 
 
 class AdvantageAirFreshAir(AdvantageAirAcEntity, SwitchEntity):
@@ -0,0 +1,644 @@
+"""Virtual time harness, mock controller and command line for advantage_air
+
+Home Assistant never imports this, it is for tests and for running by hand
+from the component directory.
+"""
+import sys
+
+if __name__ == "__main__":
+    # The platform modules next to this file would shadow select and others from the
+    # standard library, so they are only searched after it
+    sys.path.append(sys.path.pop(0))
+
+import json
+import time
+import random
+import asyncio
+import aiohttp
+import selectors
+import contextlib
+import collections
+
+try:
+    from .advantage_air import (
+        CODECS,
+        ApiError,
+        advantage_air,
+        flatten,
+        lookup,
+        percentile,
+        replay_response,
+        update,
+    )
+except ImportError:
+    from advantage_air import (
+        CODECS,
+        ApiError,
+        advantage_air,
+        flatten,
+        lookup,
+        percentile,
+        replay_response,
+        update,
+    )
+
+
+class virtual_loop(asyncio.SelectorEventLoop):
+    """Event loop whose clock jumps to the next timer whenever nothing is ready
+
+    Sleeps, timeouts and retries take no real time, so minutes of polling and
+    batching run in milliseconds with exact timing. Only use it with a session
+    that makes no real connections, such as scripted_session. Work handed to
+    threads still wakes the loop, but the clock stands still while waiting.
+    """
+
+    def __init__(self, start=0.0):
+        self.now = start
+        super().__init__(self._selector_class(self))
+
+    def time(self):
+        return self.now
+
+    class _selector_class(selectors.DefaultSelector):
+        def __init__(self, loop):
+            super().__init__()
+            self.loop = loop
+
+        def select(self, timeout=None):
+            events = super().select(0)
+            if events or timeout == 0:
+                return events
+            if timeout is None:
+                # Nothing is scheduled, only another thread can wake the loop
+                return super().select(None)
+            self.loop.now += timeout
+            return super().select(0)
+
+
+def run_virtual(main, start=0.0):
+    """Run a coroutine on a virtual_loop and return its result"""
+    loop = virtual_loop(start)
+    try:
+        return loop.run_until_complete(main)
+    finally:
+        loop.close()
+
+
+class scripted_session:
+    """Stand-in for an aiohttp session that answers from a script
+
+    script is called with the path and the decoded change of every request, and
+    returns the seconds to wait and the body to reply with, or an exception to
+    raise once waited. Requests that wait longer than their timeout time out.
+    Every request is kept in requests as (loop time, path, change) so tests can
+    assert on their timing and order.
+    """
+
+    def __init__(self, script):
+        self.script = script
+        self.requests = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    def get(self, url, params=None, timeout=None):
+        return self._respond(url.rsplit("/", 1)[-1], params, timeout)
+
+    @contextlib.asynccontextmanager
+    async def _respond(self, path, params, timeout):
+        change = json.loads(params["json"]) if params else None
+        self.requests.append((asyncio.get_running_loop().time(), path, change))
+        delay, reply = self.script(path, change)
+        if timeout is not None and timeout.total is not None and delay > timeout.total:
+            await asyncio.sleep(timeout.total)
+            raise asyncio.TimeoutError
+        await asyncio.sleep(delay)
+        if isinstance(reply, BaseException):
+            raise reply
+        yield replay_response(json.dumps(reply).encode())
+
+
+def synthetic_script(data, latency=0, jitter=0, failure=0, seed=0, lost=0):
+    """Script for scripted_session that behaves like async_serve, dropping a fraction of requests
+
+    With lost, a fraction of the writes that are applied also lose their reply.
+    """
+    rng = random.Random(seed)
+
+    def script(path, change):
+        delay = latency + rng.uniform(0, jitter)
+        if rng.random() < failure:
+            return delay, aiohttp.client_exceptions.ServerDisconnectedError()
+        if path == "getSystemData":
+            return delay, data
+        reply = mock_write(data, path, change)
+        if lost and rng.random() < lost:
+            return delay, aiohttp.client_exceptions.ServerDisconnectedError()
+        return delay, reply
+
+    return script
+
+
+def random_change(data, rng):
+    """A change to one leaf of a synthetic site, with the endpoint to send it to"""
+    choices = ["aircon"]
+    if data.get("myLights", {}).get("lights"):
+        choices.append("lights")
+    if data.get("myThings", {}).get("things"):
+        choices.append("things")
+    endpoint = rng.choice(choices)
+    if endpoint == "aircon":
+        ac_key = rng.choice(sorted(data["aircons"]))
+        zones = sorted(data["aircons"][ac_key]["zones"])
+        if rng.random() < 0.5:
+            zone = rng.choice(zones)
+            return endpoint, {ac_key: {"zones": {zone: {"value": rng.randrange(0, 101, 5)}}}}
+        field, value = rng.choice(
+            [
+                ("setTemp", rng.randint(16, 32)),
+                ("fan", rng.choice(["low", "medium", "high"])),
+                ("mode", rng.choice(["cool", "heat", "vent", "dry"])),
+                ("state", rng.choice(["on", "off"])),
+            ]
+        )
+        return endpoint, {ac_key: {"info": {field: value}}}
+    if endpoint == "lights":
+        light = rng.choice(sorted(data["myLights"]["lights"]))
+        return endpoint, {light: {"id": light, "state": rng.choice(["on", "off"])}}
+    thing = rng.choice(sorted(data["myThings"]["things"]))
+    return endpoint, {thing: {"id": thing, "value": rng.randrange(0, 101, 10)}}
+
+
+async def async_stress(api, data, changes=5000, window=10, seed=0):
+    """Send many concurrent changes to a mock controller and check the latest of each leaf won
+
+    The changes start at random times within window seconds and each is
+    sent to the endpoint it belongs to. Returns the leaves whose final value
+    on the controller is not the one written last, as (path, expected, actual),
+    and the figures of the run.
+    """
+    rng = random.Random(seed)
+    endpoints = {"aircon": api.aircon, "lights": api.lights, "things": api.things}
+    expected = {}
+    errors = collections.Counter()
+    loop = asyncio.get_running_loop()
+
+    async def send(delay, endpoint, change):
+        await asyncio.sleep(delay)
+        # Recorded in the same step as queueing, so this is the order of the writes
+        for path, value in flatten(change):
+            if path[-1] != "id":
+                expected[endpoint.root + path] = value
+        try:
+            await endpoint.async_set(change)
+        except ApiError as err:
+            errors[str(err)] += 1
+
+    begin = loop.time()
+    started = time.perf_counter()
+    tasks = []
+    for _ in range(changes):
+        name, change = random_change(data, rng)
+        tasks.append(send(rng.uniform(0, window), endpoints[name], change))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - begin
+    real = time.perf_counter() - started
+
+    mismatches = [
+        (path, value, lookup(data, path))
+        for path, value in expected.items()
+        if lookup(data, path) != value
+    ]
+    requests = sum(endpoint.requests for endpoint in endpoints.values())
+    merged = sum(endpoint.merged for endpoint in endpoints.values())
+    return mismatches, {
+        "changes": changes,
+        "leaves": len(expected),
+        "requests": requests,
+        "seconds": elapsed,
+        "requests_per_second": requests / elapsed if elapsed else 0,
+        "changes_per_real_second": changes / real if real else 0,
+        "merge_factor": merged / requests if requests else 0,
+        "errors": dict(errors),
+    }
+
+
+def mock_write(data, endpoint, change):
+    """Apply a change to the data of a mock controller and reply like the tablet"""
+    # Reject like the tablet does when a temperature is out of range
+    for path, value in flatten(change):
+        if path[-1] == "setTemp" and not 16 <= value <= 32:
+            return {"ack": False, "reason": "setTemp out of range"}
+    if endpoint == "setAircon":
+        root = data["aircons"]
+    elif endpoint == "setLights":
+        root = data.setdefault("myLights", {"lights": {}})["lights"]
+    else:
+        root = data.setdefault("myThings", {"things": {}})["things"]
+    update(root, change)
+    return {"ack": True, "request": endpoint}
+
+
+def synthetic_system(aircons=1, zones=8, lights=0, things=0, seed=0):
+    """Build getSystemData for a made up site of the given size"""
+    rng = random.Random(seed)
+    data = {
+        "system": {
+            "name": f"Synthetic {aircons}x{zones}",
+            "rid": f"synthetic-{aircons}-{zones}-{lights}-{things}",
+            "sysType": "MyPlace",
+            "myAppRev": "15.1001",
+            "needsUpdate": False,
+            "hasAircons": aircons > 0,
+            "hasLights": lights > 0,
+            "hasThings": things > 0,
+            "dealerPhoneNumber": "0000000000",
+            "latitude": 0,
+            "longitude": 0,
+            "logoPIN": "0000",
+            "postCode": "0000",
+        },
+        "aircons": {},
+    }
+    for a in range(1, aircons + 1):
+        data["aircons"][f"ac{a}"] = {
+            "info": {
+                "name": f"AC {a}",
+                "state": "off",
+                "mode": "cool",
+                "fan": "medium",
+                "setTemp": 24,
+                "filterCleanStatus": 0,
+                "freshAirStatus": "none",
+                "myZone": 1,
+                "countDownToOn": 0,
+                "countDownToOff": 0,
+                "climateControlModeEnabled": False,
+                "myAutoModeEnabled": False,
+                "aaAutoFanModeEnabled": False,
+                "myAutoCoolTargetTemp": 24,
+                "myAutoHeatTargetTemp": 20,
+            },
+            "zones": {
+                f"z{z:02}": {
+                    "name": f"Zone {z}",
+                    "number": z,
+                    "type": 1 if z % 2 else 0,
+                    "state": "open",
+                    "value": 100,
+                    "setTemp": 24,
+                    "measuredTemp": round(rng.uniform(18, 28), 1),
+                    "motion": 0,
+                    "motionConfig": 2,
+                    "rssi": rng.randint(0, 100),
+                    "error": 0,
+                    "minDamper": 0,
+                    "maxDamper": 100,
+                }
+                for z in range(1, zones + 1)
+            },
+        }
+    if lights:
+        data["myLights"] = {
+            "lights": {
+                f"{l:06}": {
+                    "id": f"{l:06}",
+                    "name": f"Light {l}",
+                    "state": "off",
+                    "value": 100,
+                    "relay": l % 2 == 0,
+                }
+                for l in range(1, lights + 1)
+            }
+        }
+    if things:
+        data["myThings"] = {
+            "things": {
+                f"{t:06}": {
+                    "id": f"{t:06}",
+                    "name": f"Thing {t}",
+                    "channelDipState": (1, 3, 4, 5, 8)[t % 5],
+                    "value": 0,
+                    "buttonType": "upDown",
+                }
+                for t in range(1, things + 1)
+            }
+        }
+    return data
+
+
+async def async_serve(
+    data, host="127.0.0.1", port=2025, latency=0, jitter=0, max_query=None
+):
+    """Serve a mock controller that applies changes to data until cancelled
+
+    With max_query, writes with a longer query string fail like on a tablet.
+    """
+    from aiohttp import web
+
+    async def respond(body):
+        if latency or jitter:
+            await asyncio.sleep(latency + random.uniform(0, jitter))
+        return web.json_response(body)
+
+    async def get_system_data(request):
+        return await respond(data)
+
+    async def set_endpoint(request):
+        if max_query and len(request.rel_url.raw_query_string) > max_query + 5:
+            return web.Response(status=414)
+        try:
+            change = json.loads(request.query["json"])
+        except (KeyError, ValueError):
+            return await respond({"ack": False, "reason": "Invalid json"})
+        return await respond(mock_write(data, request.match_info["endpoint"], change))
+
+    app = web.Application()
+    app.router.add_get("/getSystemData", get_system_data)
+    app.router.add_get("/{endpoint:set(Aircon|Lights|Things)}", set_endpoint)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def _async_main(args):
+    if args.command == "serve":
+        data = synthetic_system(args.aircons, args.zones, args.lights, args.things)
+        print(f"Serving {data['system']['name']} on {args.ip}:{args.port}")
+        await async_serve(
+            data, args.ip, args.port, args.latency, args.jitter, args.max_query
+        )
+        return
+
+    if args.command in ("simulate", "stress"):
+        data = synthetic_system(args.aircons, args.zones, args.lights, args.things)
+        # Seeded so the same arguments always simulate the same run
+        random.seed(args.seed)
+        session = scripted_session(
+            synthetic_script(
+                data,
+                args.latency,
+                args.jitter,
+                args.failure,
+                args.seed,
+                getattr(args, "lost", 0),
+            )
+        )
+    else:
+        session = aiohttp.ClientSession()
+
+    async with session:
+        api = advantage_air(
+            args.ip,
+            port=args.port,
+            session=session,
+            retry=args.retry,
+            timeout=args.timeout,
+            max_query=args.max_query,
+        )
+        endpoints = {"aircon": api.aircon, "lights": api.lights, "things": api.things}
+
+        if args.command == "get":
+            text = json.dumps(await api.async_get(), indent=2)
+            if args.output:
+                with open(args.output, "w") as file:
+                    file.write(text)
+            else:
+                print(text)
+
+        elif args.command == "set":
+            await endpoints[args.endpoint].async_set(json.loads(args.change))
+            print("Acknowledged")
+
+        elif args.command == "probe":
+            latencies = []
+            for _ in range(args.count):
+                start = time.perf_counter()
+                await api.async_get(1)
+                latencies.append(time.perf_counter() - start)
+            _report("getSystemData", latencies, args.count)
+
+        elif args.command in ("load", "simulate"):
+            await _async_load(api, endpoints, args)
+
+        elif args.command == "stress":
+            mismatches, stats = await async_stress(
+                api, data, args.changes, args.window, args.seed
+            )
+            await api.async_stop()
+            print(
+                f"{stats['changes']} changes to {stats['leaves']} leaves in "
+                f"{stats['requests']} requests over {stats['seconds']:.1f}s, "
+                f"{stats['requests_per_second']:.1f} requests per second"
+            )
+            print(
+                f"{stats['merge_factor']:.2f} changes merged per request, "
+                f"{stats['changes_per_real_second']:.0f} changes per second of real time"
+            )
+            for error, count in stats["errors"].items():
+                print(f"{count} x {error}")
+            for path, value, actual in mismatches:
+                print(f"{'.'.join(path)} is {actual!r}, last written {value!r}")
+            if mismatches or stats["errors"]:
+                raise ApiError(f"{len(mismatches)} leaves did not keep the last write")
+            print("Every leaf kept the last write")
+
+        await api.async_stop()
+
+
+async def _async_load(api, endpoints, args):
+    """Mix reads and writes at a target rate and report their latency"""
+    data = await api.async_get(1)
+    if args.change:
+        endpoint, change = endpoints[args.endpoint], json.loads(args.change)
+    else:
+        # Rewrite the current target temperature of the first aircon, which changes nothing
+        ac_key = next(iter(data["aircons"]))
+        setTemp = data["aircons"][ac_key]["info"]["setTemp"]
+        endpoint, change = api.aircon, {ac_key: {"info": {"setTemp": setTemp}}}
+
+    results = {"getSystemData": [], endpoint.endpoint: []}
+    errors = collections.Counter()
+
+    loop = asyncio.get_running_loop()
+
+    async def request(write):
+        name = endpoint.endpoint if write else "getSystemData"
+        # Loop time, so simulated runs report simulated latency
+        start = loop.time()
+        try:
+            if write:
+                await endpoint.async_set(change)
+            else:
+                await api.async_get(1)
+        except ApiError as err:
+            errors[f"{name}: {err}"] += 1
+        else:
+            results[name].append(loop.time() - start)
+
+    total = int(args.rate * args.duration)
+    begin = loop.time()
+    tasks = []
+    for index in range(total):
+        # Open loop, requests start on schedule however long earlier ones take
+        await asyncio.sleep(max(0, begin + index / args.rate - loop.time()))
+        tasks.append(asyncio.ensure_future(request(random.random() < args.writes)))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - begin
+
+    print(f"{total} requests in {elapsed:.1f}s, {total / elapsed:.1f} per second")
+    for name, latencies in results.items():
+        _report(name, latencies, len(latencies))
+    if endpoint.requests:
+        print(f"{endpoint.merged / endpoint.requests:.2f} changes merged per write")
+    for error, count in errors.most_common():
+        print(f"{count} x {error}")
+
+
+def _bench_codecs(args):
+    """Compare the codecs on a synthetic site of the given size"""
+    data = synthetic_system(args.aircons, args.zones, args.lights, args.things)
+    body = json.dumps(data).encode()
+    print(f"{len(body)} byte getSystemData, {args.count} rounds")
+    for name, candidate in CODECS.items():
+        start = time.perf_counter()
+        for _ in range(args.count):
+            candidate.loads(body)
+        decode = (time.perf_counter() - start) / args.count
+        start = time.perf_counter()
+        for _ in range(args.count):
+            candidate.dumps(data)
+        encode = (time.perf_counter() - start) / args.count
+        print(f"{name}: decode {decode * 1e6:.0f}us, encode {encode * 1e6:.0f}us")
+
+
+def _report(name, latencies, count):
+    if not latencies:
+        print(f"{name}: no successful requests")
+        return
+    print(
+        f"{name}: {count} requests, "
+        f"p50 {percentile(latencies, 0.5) * 1000:.0f}ms, "
+        f"p95 {percentile(latencies, 0.95) * 1000:.0f}ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.0f}ms, "
+        f"max {max(latencies) * 1000:.0f}ms"
+    )
+
+
+def main(argv=None):
+    # Only needed on the command line, so not imported with the integration
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="advantage_air", description="Probe and load test an Advantage Air controller"
+    )
+    parser.add_argument(
+        "ip", nargs="?", default="127.0.0.1", help="address of the controller, or to serve on"
+    )
+    parser.add_argument("--port", type=int, default=2025)
+    parser.add_argument("--retry", type=int, default=5)
+    parser.add_argument(
+        "--timeout", type=float, default=20, help="longest timeout per attempt"
+    )
+    parser.add_argument(
+        "--max-query", type=int, default=2000, help="longest ?json= for a write"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    get = commands.add_parser("get", help="fetch getSystemData")
+    get.add_argument("--output", help="save to this file instead of printing")
+
+    set_ = commands.add_parser("set", help="send a change")
+    set_.add_argument("endpoint", choices=["aircon", "lights", "things"])
+    set_.add_argument("change", help='JSON change, e.g. {"ac1":{"info":{"state":"on"}}}')
+
+    probe = commands.add_parser("probe", help="measure getSystemData latency")
+    probe.add_argument("--count", type=int, default=100)
+
+    load = commands.add_parser("load", help="send a mix of reads and writes")
+    simulate = commands.add_parser(
+        "simulate", help="load test a synthetic controller in virtual time"
+    )
+    for parser_ in (load, simulate):
+        parser_.add_argument("--rate", type=float, default=5, help="requests per second")
+        parser_.add_argument("--duration", type=float, default=60, help="seconds")
+        parser_.add_argument("--writes", type=float, default=0.1, help="fraction of writes")
+        parser_.add_argument(
+            "--endpoint", choices=["aircon", "lights", "things"], default="aircon"
+        )
+        parser_.add_argument("--change", help="JSON change to write, defaults to a no-op")
+    simulate.add_argument("--aircons", type=int, default=1)
+    simulate.add_argument("--zones", type=int, default=8)
+    simulate.add_argument("--lights", type=int, default=0)
+    simulate.add_argument("--things", type=int, default=0)
+    simulate.add_argument("--latency", type=float, default=0.2, help="seconds per response")
+    simulate.add_argument("--jitter", type=float, default=0.3, help="extra random seconds")
+    simulate.add_argument(
+        "--failure", type=float, default=0, help="fraction of dropped connections"
+    )
+    simulate.add_argument("--seed", type=int, default=0)
+
+    stress = commands.add_parser(
+        "stress",
+        help="send many concurrent changes to a synthetic controller in virtual time "
+        "and check the last write of every leaf won",
+    )
+    stress.add_argument("--changes", type=int, default=5000)
+    stress.add_argument(
+        "--window", type=float, default=10, help="seconds the changes start within"
+    )
+    stress.add_argument("--aircons", type=int, default=2)
+    stress.add_argument("--zones", type=int, default=8)
+    stress.add_argument("--lights", type=int, default=10)
+    stress.add_argument("--things", type=int, default=10)
+    stress.add_argument("--latency", type=float, default=0.2, help="seconds per response")
+    stress.add_argument("--jitter", type=float, default=0.3, help="extra random seconds")
+    stress.add_argument(
+        "--failure", type=float, default=0.1, help="fraction of dropped connections"
+    )
+    stress.add_argument(
+        "--lost", type=float, default=0.05, help="fraction of applied writes whose reply is lost"
+    )
+    stress.add_argument("--seed", type=int, default=0)
+
+    serve = commands.add_parser("serve", help="serve a mock controller")
+    serve.add_argument("--aircons", type=int, default=1)
+    serve.add_argument("--zones", type=int, default=8)
+    serve.add_argument("--lights", type=int, default=0)
+    serve.add_argument("--things", type=int, default=0)
+    serve.add_argument("--latency", type=float, default=0, help="seconds per response")
+    serve.add_argument("--jitter", type=float, default=0, help="extra random seconds")
+
+    bench = commands.add_parser("bench-codec", help="compare JSON codecs")
+    bench.add_argument("--aircons", type=int, default=4)
+    bench.add_argument("--zones", type=int, default=10)
+    bench.add_argument("--lights", type=int, default=50)
+    bench.add_argument("--things", type=int, default=50)
+    bench.add_argument("--count", type=int, default=1000)
+
+    args = parser.parse_args(argv)
+    if args.command == "bench-codec":
+        _bench_codecs(args)
+        return
+    try:
+        if args.command in ("simulate", "stress"):
+            start = time.perf_counter()
+            run_virtual(_async_main(args))
+            print(f"Simulated in {time.perf_counter() - start:.2f}s")
+        else:
+            asyncio.run(_async_main(args))
+    except KeyboardInterrupt:
+        pass
+    except ApiError as err:
+        sys.exit(str(err))
+
+
+if __name__ == "__main__":
+    main()
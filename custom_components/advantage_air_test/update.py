@@ -6,7 +6,7 @@ from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN as ADVANTAGE_AIR_DOMAIN
+from .const import ADVANTAGE_AIR_SLOW_STALENESS, DOMAIN as ADVANTAGE_AIR_DOMAIN
 
 
 async def async_setup_entry(
@@ -30,6 +30,7 @@ class AdvantageAirApp(CoordinatorEntity, UpdateEntity):
     def __init__(self, instance):
         """Initialize the Advantage Air App."""
         super().__init__(instance["coordinator"])
+        self._async_require = instance["require"]
         self._attr_unique_id = f'{self.coordinator.data["system"]["rid"]}'
         self._attr_device_info = DeviceInfo(
             identifiers={
@@ -41,6 +42,11 @@ class AdvantageAirApp(CoordinatorEntity, UpdateEntity):
             sw_version=self.coordinator.data["system"]["myAppRev"],
         )
 
+    async def async_added_to_hass(self) -> None:
+        """Tell the scheduler the app version is only needed hourly."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._async_require(ADVANTAGE_AIR_SLOW_STALENESS))
+
     @property
     def installed_version(self):
         """Return the current app version."""
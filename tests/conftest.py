@@ -0,0 +1,10 @@
+"""Make the client and its harness importable without Home Assistant."""
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# Searched last, so the platform modules next to them do not shadow the standard library
+sys.path.append(os.path.join(ROOT, "custom_components", "advantage_air_test"))
+# For the tests that set up the integration in Home Assistant
+sys.path.append(ROOT)
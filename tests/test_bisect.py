@@ -0,0 +1,75 @@
+"""Bisecting a rejected batch to fail only the changes the controller refused."""
+import asyncio
+
+from advantage_air import ApiRejected, advantage_air
+from testing import mock_write, run_virtual, scripted_session, synthetic_system
+
+# The first is out of range and rejected, with the others in the same batch
+SET_TEMPS = [40, 22, 23, 24]
+
+
+def batch(max_bisect=8):
+    data = synthetic_system(aircons=len(SET_TEMPS), zones=2)
+
+    def script(path, change):
+        return 0.1, mock_write(data, path, change)
+
+    async def main():
+        session = scripted_session(script)
+        api = advantage_air(
+            "test", session=session, coalesce=0.5, max_bisect=max_bisect
+        )
+        results = await asyncio.gather(
+            *(
+                api.aircon.async_set({f"ac{index}": {"info": {"setTemp": value}}})
+                for index, value in enumerate(SET_TEMPS, 1)
+            ),
+            return_exceptions=True,
+        )
+        await api.async_stop()
+        return results, session, api.aircon.bisected
+
+    results, session, bisected = run_virtual(main())
+    set_temps = [aircon["info"]["setTemp"] for aircon in data["aircons"].values()]
+    return results, session.requests, bisected, set_temps
+
+
+def test_only_the_caller_of_the_rejected_change_fails():
+    results, requests, bisected, set_temps = batch()
+    assert isinstance(results[0], ApiRejected)
+    assert not any(isinstance(result, Exception) for result in results[1:])
+    assert set_temps[1:] == SET_TEMPS[1:]
+    assert set_temps[0] != SET_TEMPS[0]
+    # The batch, both halves of it, then both halves of the rejected half
+    assert len(requests) == 1 + 4
+    assert bisected == 4
+    assert requests[0][2] == {
+        f"ac{index}": {"info": {"setTemp": value}}
+        for index, value in enumerate(SET_TEMPS, 1)
+    }
+    assert requests[-2:] == [
+        (requests[-2][0], "setAircon", {"ac1": {"info": {"setTemp": 40}}}),
+        (requests[-1][0], "setAircon", {"ac2": {"info": {"setTemp": 22}}}),
+    ]
+
+
+def test_rest_fails_as_a_whole_once_the_budget_runs_out():
+    results, requests, bisected, set_temps = batch(max_bisect=2)
+    # Only the first split fits the budget, so the rejected half fails together
+    assert len(requests) == 1 + 2
+    assert bisected == 2
+    assert [isinstance(result, ApiRejected) for result in results] == [
+        True,
+        True,
+        False,
+        False,
+    ]
+    assert set_temps[2:] == SET_TEMPS[2:]
+    assert set_temps[1] != SET_TEMPS[1]
+
+
+def test_no_bisection_without_a_budget():
+    results, requests, bisected, set_temps = batch(max_bisect=0)
+    assert len(requests) == 1
+    assert bisected == 0
+    assert all(isinstance(result, ApiRejected) for result in results)
@@ -0,0 +1,97 @@
+"""Pending changes overlaid on snapshots and the change set between them."""
+import asyncio
+
+import pytest
+
+from advantage_air import ApiRejected, advantage_air
+from testing import run_virtual, scripted_session, synthetic_system, update
+
+PATH = ("myThings", "things", "000001", "value")
+
+
+def test_changes_follow_the_overlaid_snapshots():
+    data = synthetic_system(aircons=1, zones=2, things=1)
+    controller = {"value": 0}
+
+    def script(path, change):
+        if path == "getSystemData":
+            snapshot = update({}, data)
+            snapshot["myThings"]["things"]["000001"]["value"] = controller["value"]
+            return 0.1, snapshot
+        # Acknowledged, but the controller applies it late
+        return 0.1, {"ack": True}
+
+    async def main():
+        api = advantage_air("test", session=scripted_session(script))
+        seen = []
+
+        async def poll():
+            snapshot = await api.async_get()
+            seen.append((snapshot["myThings"]["things"]["000001"]["value"], api.changes))
+
+        await poll()
+        await api.things.async_set({"000001": {"id": "000001", "value": 100}})
+        await poll()
+        controller["value"] = 100
+        await poll()
+        await api.things.async_set({"000001": {"id": "000001", "value": 50}})
+        await poll()
+        # Never applied, so the snapshot reverts once the overlay expires
+        await asyncio.sleep(api.overlay_ttl)
+        await poll()
+        await api.async_stop()
+        return seen
+
+    assert run_virtual(main()) == [
+        (0, None),
+        (100, [PATH]),
+        (100, []),
+        (50, [PATH]),
+        (100, [PATH]),
+    ]
+
+
+def test_cancelled_caller_keeps_its_change_overlaid():
+    data = synthetic_system(aircons=1, zones=2, things=1)
+
+    def script(path, change):
+        if path == "getSystemData":
+            return 0.1, data
+        # Acknowledged, but the controller applies it late
+        return 1, {"ack": True}
+
+    async def main():
+        api = advantage_air("test", session=scripted_session(script))
+        task = asyncio.ensure_future(
+            api.things.async_set({"000001": {"id": "000001", "value": 100}})
+        )
+        await asyncio.sleep(0.2)
+        task.cancel()
+        # The writer still sends the change, so polls meanwhile show it
+        snapshot = await api.async_get()
+        await api.async_stop()
+        return snapshot["myThings"]["things"]["000001"]["value"], api.things.overlay
+
+    value, overlay = run_virtual(main())
+    assert value == 100
+    # Acknowledged, so only kept until a snapshot shows it or it expires
+    assert overlay[PATH][2] is not None
+
+
+def test_failed_write_is_dropped_from_the_overlay():
+    data = synthetic_system(aircons=1, zones=2, things=1)
+
+    def script(path, change):
+        if path == "getSystemData":
+            return 0.1, data
+        return 0.1, {"ack": False, "reason": "rejected"}
+
+    async def main():
+        api = advantage_air("test", session=scripted_session(script))
+        with pytest.raises(ApiRejected):
+            await api.things.async_set({"000001": {"id": "000001", "value": 100}})
+        snapshot = await api.async_get()
+        await api.async_stop()
+        return snapshot["myThings"]["things"]["000001"]["value"], api.things.overlay
+
+    assert run_virtual(main()) == (0, {})
@@ -0,0 +1,89 @@
+"""Setup time of synthetic sites of several sizes.
+
+Needs pytest-homeassistant-custom-component, run with -s to print the sweep:
+python -m pytest tests/test_setup.py -s
+"""
+import socket
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.const import CONF_IP_ADDRESS, CONF_PORT
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.advantage_air_test.const import DOMAIN
+from custom_components.advantage_air_test.testing import (
+    scripted_session,
+    synthetic_script,
+    synthetic_system,
+)
+
+pytestmark = pytest.mark.asyncio
+
+# Aircons, zones per aircon, lights and things
+SIZES = [(1, 4, 0, 0), (2, 10, 0, 0), (4, 10, 20, 20), (8, 16, 50, 50)]
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    yield
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.parametrize("aircons,zones,lights,things", SIZES)
+async def test_setup_time(hass, aircons, zones, lights, things):
+    data = synthetic_system(aircons, zones, lights, things)
+    assert await async_setup_component(
+        hass,
+        "http",
+        {"http": {"server_host": "127.0.0.1", "server_port": _free_port()}},
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=data["system"]["name"],
+        data={CONF_IP_ADDRESS: "127.0.0.1", CONF_PORT: 2025},
+    )
+    entry.add_to_hass(hass)
+
+    # The controller answers instantly, so only the integration's own work is timed
+    with patch(
+        "custom_components.advantage_air_test.async_get_clientsession",
+        return_value=scripted_session(synthetic_script(data)),
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    timings = hass.data[DOMAIN][entry.entry_id]["timings"]
+    platforms = timings["platforms"]
+    assert set(platforms) >= {"climate", "sensor"}
+    # One per aircon and one per zone with temperature control
+    assert platforms["climate"]["entities"] == aircons + sum(
+        zone["type"] != 0
+        for aircon in data["aircons"].values()
+        for zone in aircon["zones"].values()
+    )
+    if lights:
+        assert platforms["light"]["entities"] >= lights
+    print(
+        f"\n{data['system']['name']} with {lights} lights and {things} things: "
+        f"{timings['total'] * 1000:.1f}ms total, "
+        f"first refresh {timings['first_refresh'] * 1000:.1f}ms, "
+        f"{sum(p['entities'] for p in platforms.values())} entities"
+    )
+    for domain, platform in sorted(platforms.items()):
+        print(
+            f"  {domain}: import {platform['import'] * 1000:.1f}ms, "
+            f"setup {platform['setup'] * 1000:.1f}ms, "
+            f"{platform['entities']} entities"
+        )
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
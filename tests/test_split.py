@@ -0,0 +1,101 @@
+"""Splitting writes that exceed the query length limit."""
+import json
+
+import pytest
+
+from advantage_air import advantage_air, flatten, query_length, split, update
+from testing import mock_write, run_virtual, scripted_session, synthetic_system
+
+
+def zones(ac_key, count, value):
+    return {
+        ac_key: {"zones": {f"z{z:02}": {"value": value} for z in range(1, count + 1)}}
+    }
+
+
+def merged(chunks):
+    change = {}
+    for chunk in chunks:
+        update(change, chunk)
+    return change
+
+
+def test_change_that_fits_is_sent_whole():
+    change = zones("ac1", 2, 50)
+    assert split(change, 2000, json.dumps) == [change]
+    assert split(change, None, json.dumps) == [change]
+
+
+def test_chunks_fit_the_limit_and_keep_their_order():
+    change = {**zones("ac1", 10, 50), **zones("ac2", 10, 60)}
+    change["ac1"]["info"] = {"setTemp": 22, "fan": "high"}
+    chunks = split(change, 200, json.dumps)
+    assert len(chunks) > 2
+    assert all(query_length(chunk, json.dumps) <= 200 for chunk in chunks)
+    assert merged(chunks) == change
+    # Leaves go out in the order they were in the change
+    assert [path for chunk in chunks for path, _ in flatten(chunk)] == [
+        path for path, _ in flatten(change)
+    ]
+
+
+def test_each_aircon_stays_in_one_chunk_while_it_fits():
+    change = {**zones("ac1", 4, 50), **zones("ac2", 4, 60)}
+    limit = max(
+        query_length({key: value}, json.dumps) for key, value in change.items()
+    )
+    chunks = split(change, limit, json.dumps)
+    assert chunks == [{"ac1": change["ac1"]}, {"ac2": change["ac2"]}]
+
+
+def test_aircon_too_long_on_its_own_is_split_by_zone():
+    change = zones("ac1", 12, 50)
+    chunks = split(change, 150, json.dumps)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert list(chunk) == ["ac1"]
+        assert list(chunk["ac1"]) == ["zones"]
+        # A zone is never split across chunks
+        assert all(zone == {"value": 50} for zone in chunk["ac1"]["zones"].values())
+    assert merged(chunks) == change
+
+
+def test_lights_keep_their_id_in_every_chunk():
+    change = {
+        f"{l:06}": {"id": f"{l:06}", "state": "on", "value": 100} for l in range(1, 9)
+    }
+    chunks = split(change, 120, json.dumps)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        for light_id, light in chunk.items():
+            assert light["id"] == light_id
+    assert merged(chunks) == change
+
+
+def test_writer_sends_chunks_in_order_within_the_limit():
+    data = synthetic_system(aircons=2, zones=10)
+    change = {**zones("ac1", 10, 50), **zones("ac2", 10, 60)}
+
+    def script(path, change):
+        return 0.1, mock_write(data, path, change)
+
+    async def main():
+        session = scripted_session(script)
+        api = advantage_air("test", session=session, max_query=200)
+        await api.aircon.async_set(change)
+        await api.async_stop()
+        return session, api.codec.dumps
+
+    session, dumps = run_virtual(main())
+    sent = [request for _, _, request in session.requests]
+    assert len(sent) > 2
+    assert sent == split(change, 200, dumps)
+    # One after the other, each once the previous was acknowledged
+    assert [t for t, _, _ in session.requests] == pytest.approx(
+        [0.1 * index for index in range(len(sent))]
+    )
+    assert all(
+        data["aircons"][ac_key]["zones"][zone_key]["value"] == zone["value"]
+        for ac_key, aircon in change.items()
+        for zone_key, zone in aircon["zones"].items()
+    )
@@ -0,0 +1,80 @@
+"""Last writer wins under many concurrent changes and injected failures."""
+import asyncio
+
+import aiohttp
+import pytest
+
+from advantage_air import advantage_air
+from testing import (
+    async_stress,
+    mock_write,
+    run_virtual,
+    scripted_session,
+    synthetic_script,
+    synthetic_system,
+)
+
+
+def stress(changes, seed, failure, lost, coalesce=0):
+    data = synthetic_system(aircons=2, zones=8, lights=10, things=10, seed=seed)
+
+    async def main():
+        session = scripted_session(
+            synthetic_script(data, 0.2, 0.3, failure, seed, lost)
+        )
+        api = advantage_air("test", session=session, coalesce=coalesce)
+        result = await async_stress(api, data, changes, 10, seed)
+        await api.async_stop()
+        return result
+
+    return run_virtual(main())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_last_write_wins_with_dropped_requests_and_lost_replies(seed):
+    mismatches, stats = stress(3000, seed, failure=0.1, lost=0.05)
+    assert mismatches == []
+    assert stats["errors"] == {}
+    assert stats["merge_factor"] > 10
+
+
+def test_last_write_wins_with_coalescing():
+    mismatches, stats = stress(3000, 0, failure=0.2, lost=0.1, coalesce=0.1)
+    assert mismatches == []
+    assert stats["errors"] == {}
+    # The writers drain within a few requests of the last change
+    assert stats["seconds"] < 10 + 5
+    assert stats["merge_factor"] > 10
+
+
+def test_newer_change_is_not_overwritten_by_a_retried_batch():
+    data = synthetic_system(aircons=1, zones=2)
+    # The first write is applied but its reply is lost, so it is sent again
+    lost = [True]
+
+    def script(path, change):
+        reply = mock_write(data, path, change)
+        if lost:
+            lost.pop()
+            return 0.3, aiohttp.client_exceptions.ServerDisconnectedError()
+        return 0.3, reply
+
+    async def main():
+        session = scripted_session(script)
+        api = advantage_air("test", session=session)
+
+        async def later(delay, value):
+            await asyncio.sleep(delay)
+            await api.aircon.async_set({"ac1": {"info": {"setTemp": value}}})
+
+        await asyncio.gather(later(0, 20), later(0.5, 22))
+        await api.async_stop()
+        return session
+
+    session = run_virtual(main())
+    assert [(t, change) for t, _, change in session.requests] == [
+        (0, {"ac1": {"info": {"setTemp": 20}}}),
+        (pytest.approx(1.3), {"ac1": {"info": {"setTemp": 20}}}),
+        (pytest.approx(1.6), {"ac1": {"info": {"setTemp": 22}}}),
+    ]
+    assert data["aircons"]["ac1"]["info"]["setTemp"] == 22
@@ -0,0 +1,223 @@
+"""Timing of polls, retries and write batching on a virtual clock."""
+import asyncio
+
+import aiohttp
+import pytest
+
+from advantage_air import ApiError, advantage_air
+from testing import mock_write, run_virtual, scripted_session, synthetic_system
+
+
+def times(session, path=None):
+    """Loop time of every request, or of those to one path."""
+    return [t for t, p, _ in session.requests if path in (None, p)]
+
+
+def test_poll_retries_a_second_apart():
+    data = synthetic_system()
+    failures = [aiohttp.client_exceptions.ServerDisconnectedError()] * 2
+
+    def script(path, change):
+        return 0.2, failures.pop() if failures else data
+
+    async def main():
+        session = scripted_session(script)
+        api = advantage_air("test", session=session, retry=5)
+        result = await api.async_get()
+        return session, result, asyncio.get_running_loop().time()
+
+    session, result, end = run_virtual(main())
+    assert result["system"] == data["system"]
+    assert times(session) == pytest.approx([0, 1.2, 2.4])
+    assert end == pytest.approx(2.6)
+
+
+def test_poll_times_out_at_the_ceiling_then_gives_up():
+    data = synthetic_system()
+
+    async def main():
+        session = scripted_session(lambda path, change: (30, data))
+        api = advantage_air("test", session=session, retry=2, timeout=4)
+        with pytest.raises(ApiError, match="2 failed attempts"):
+            await api.async_get()
+        return session, api, asyncio.get_running_loop().time()
+
+    session, api, end = run_virtual(main())
+    assert times(session) == pytest.approx([0, 5])
+    # The second timeout is backed off, but limited by the ceiling
+    assert api.estimate.backoff == 4
+    assert end == pytest.approx(10)
+
+
+def test_deadline_cuts_retries_short():
+    data = synthetic_system()
+
+    async def main():
+        session = scripted_session(lambda path, change: (30, data))
+        api = advantage_air("test", session=session, retry=10, timeout=4, deadline=7)
+        with pytest.raises(ApiError):
+            await api.async_get()
+        return session, asyncio.get_running_loop().time()
+
+    session, end = run_virtual(main())
+    # The second request only gets what is left of the deadline
+    assert times(session) == pytest.approx([0, 5])
+    assert end == pytest.approx(7)
+
+
+def test_timeouts_follow_the_latency_estimate():
+    data = synthetic_system()
+    delays = [0.1] * 5 + [2]
+
+    def script(path, change):
+        return delays.pop(0) if delays else 0.1, data
+
+    async def main():
+        session = scripted_session(script)
+        api = advantage_air("test", session=session, retry=2, timeout=4)
+        for _ in range(5):
+            await api.async_get()
+        start = asyncio.get_running_loop().time()
+        await api.async_get()
+        return session, asyncio.get_running_loop().time() - start
+
+    session, elapsed = run_virtual(main())
+    # A 0.1 second controller is given up on after the 1 second floor, not 4
+    assert elapsed == pytest.approx(1 + 1 + 0.1)
+    assert len(session.requests) == 7
+
+
+def test_writes_within_coalesce_share_a_request():
+    data = synthetic_system(aircons=1, zones=2)
+
+    def script(path, change):
+        if path == "getSystemData":
+            return 0.1, data
+        return 0.1, mock_write(data, path, change)
+
+    async def main():
+        session = scripted_session(script)
+        api = advantage_air("test", session=session, coalesce=0.5)
+        loop = asyncio.get_running_loop()
+
+        async def later(delay, change):
+            await asyncio.sleep(delay)
+            return await api.aircon.async_set(change)
+
+        results = await asyncio.gather(
+            later(0, {"ac1": {"info": {"setTemp": 20}}}),
+            later(0.2, {"ac1": {"zones": {"z01": {"value": 50}}}}),
+            later(0.4, {"ac1": {"info": {"setTemp": 21}}}),
+            later(0.7, {"ac1": {"info": {"fan": "high"}}}),
+        )
+        await api.async_stop()
+        return session, results, loop.time()
+
+    session, results, end = run_virtual(main())
+    assert [(t, p) for t, p, _ in session.requests] == [
+        (pytest.approx(0.5), "setAircon"),
+        (pytest.approx(1.2), "setAircon"),
+    ]
+    assert session.requests[0][2] == {
+        "ac1": {"info": {"setTemp": 21}, "zones": {"z01": {"value": 50}}}
+    }
+    assert session.requests[1][2] == {"ac1": {"info": {"fan": "high"}}}
+    # Only the first caller of each batch refreshes
+    assert results == [True, False, False, True]
+    assert data["aircons"]["ac1"]["info"]["setTemp"] == 21
+    assert end == pytest.approx(1.3)
+
+
+def test_write_retries_after_a_dropped_connection():
+    data = synthetic_system(aircons=1, zones=2)
+    failures = [aiohttp.client_exceptions.ServerDisconnectedError()]
+
+    def script(path, change):
+        return 0.3, failures.pop() if failures else mock_write(data, path, change)
+
+    async def main():
+        session = scripted_session(script)
+        api = advantage_air("test", session=session)
+        await api.aircon.async_set({"ac1": {"info": {"state": "on"}}})
+        await api.async_stop()
+        return session
+
+    session = run_virtual(main())
+    assert times(session, "setAircon") == pytest.approx([0, 1.3])
+    assert data["aircons"]["ac1"]["info"]["state"] == "on"
+
+
+def test_slow_controller_backs_off_past_the_initial_timeout():
+    data = synthetic_system()
+
+    async def main():
+        session = scripted_session(lambda path, change: (6, data))
+        api = advantage_air("test", session=session, retry=5)
+        await api.async_get()
+        return session, api, asyncio.get_running_loop().time()
+
+    session, api, end = run_virtual(main())
+    # 4 seconds until a response is measured, then doubled up to the 20 second ceiling
+    assert times(session) == pytest.approx([0, 5])
+    assert end == pytest.approx(11)
+    assert api.estimate.backoff == 1
+
+
+def test_deadline_passing_between_retries_is_not_a_timeout():
+    data = synthetic_system()
+
+    async def main():
+        session = scripted_session(lambda path, change: (30, data))
+        api = advantage_air("test", session=session, retry=10, deadline=4.5)
+        with pytest.raises(ApiError, match="timed out"):
+            await api.async_get()
+        return session, api
+
+    session, api = run_virtual(main())
+    assert times(session) == pytest.approx([0])
+    # Only the request that was sent and timed out backs off the estimate
+    assert api.estimate.backoff == 2
+
+
+def test_confirm_keeps_polling_after_a_failed_poll():
+    data = synthetic_system(aircons=1, zones=2)
+    failures = [aiohttp.client_exceptions.ServerDisconnectedError()]
+
+    def script(path, change):
+        if path == "getSystemData":
+            return 0.1, failures.pop() if failures else data
+        return 0.1, mock_write(data, path, change)
+
+    async def main():
+        session = scripted_session(script)
+        api = advantage_air("test", session=session)
+        await api.aircon.async_set(
+            {"ac1": {"info": {"setTemp": 18}}}, confirm=True, timeout=10
+        )
+        await api.async_stop()
+        return session, api
+
+    session, api = run_virtual(main())
+    # The failed poll waits a second before giving up, then the usual 0.25 second backoff
+    assert times(session, "getSystemData") == pytest.approx([0.1, 1.45])
+    assert list(api.convergence["setAircon:info.setTemp"]) == [pytest.approx(1.45)]
+
+
+def test_confirm_gives_up_at_the_timeout():
+    data = synthetic_system(aircons=1, zones=2)
+
+    def script(path, change):
+        if path == "getSystemData":
+            return 0.1, aiohttp.client_exceptions.ServerDisconnectedError()
+        return 0.1, {"ack": True}
+
+    async def main():
+        api = advantage_air("test", session=scripted_session(script))
+        with pytest.raises(ApiError, match="not confirmed after 5 seconds"):
+            await api.aircon.async_set(
+                {"ac1": {"info": {"setTemp": 18}}}, confirm=True, timeout=5
+            )
+        await api.async_stop()
+        return asyncio.get_running_loop().time()
+
+    assert run_virtual(main()) < 5.1